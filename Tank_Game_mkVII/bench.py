@@ -0,0 +1,312 @@
+"""Headless benchmark suite for Tank Game.
+
+Builds a few stress scenarios with the normal game constructors, steps each one for a
+fixed number of ticks under the SDL dummy video driver and reports how long every
+subsystem took per tick, as JSON:
+
+    python bench.py --output before.json
+    python bench.py --compare before.json --threshold 10
+
+Subsystem times are exclusive: wall queries made from inside the bot or bullet update
+count as `walls`, not as `ai` or `bullets`. `render` draws every tick to an off-screen
+display. Scenario setup (topping up bots, bullets and drones, keeping the player and
+boss alive) runs between ticks and is not timed.
+"""
+
+from __future__ import annotations
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+import pygame
+
+import ai_helpers
+from config import WIDTH, HEIGHT, WORLD_WIDTH, WORLD_HEIGHT
+from core import Bullet, Drone
+from walls import create_random_walls, find_free_position
+from world import World, FrameInput, spawn_bot
+from game import draw_world
+
+BENCH_VERSION = 1
+DEFAULT_TICKS = 300
+DEFAULT_SEED = 1
+# untimed ticks before measuring, so caches and the wall PVS are warm
+WARMUP_TICKS = 30
+
+SUBSYSTEMS = ("player", "drones", "spawn", "ai", "pathfinding", "bullets", "walls", "boss", "render")
+
+
+class SubsystemTimers:
+    """Accumulate exclusive wall-clock time per subsystem for wrapped callables."""
+
+    def __init__(self):
+        self.totals = dict.fromkeys(SUBSYSTEMS, 0.0)
+        self._nested = []  # time spent in timed callees, per active timed call
+
+    def wrap(self, name, fn):
+        def timed(*args, **kwargs):
+            self._nested.append(0.0)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                self.totals[name] += elapsed - self._nested.pop()
+                if self._nested:
+                    self._nested[-1] += elapsed
+        return timed
+
+    def reset(self):
+        for name in self.totals:
+            self.totals[name] = 0.0
+
+
+def _instrument(world, timers):
+    """Route the world's per-tick work through `timers`; returns an undo callable."""
+    world._step_player = timers.wrap("player", world._step_player)
+    world._spawn_bots = timers.wrap("spawn", world._spawn_bots)
+    world._step_bots = timers.wrap("ai", world._step_bots)
+    world._bots_los = timers.wrap("walls", world._bots_los)
+    world._step_bullets = timers.wrap("bullets", world._step_bullets)
+    world.bullets.wall_hits = timers.wrap("walls", world.bullets.wall_hits)
+    world.flow.update = timers.wrap("pathfinding", world.flow.update)
+    world.player.update_drones = timers.wrap("drones", world.player.update_drones)
+    world.boss_manager.update = timers.wrap("boss", world.boss_manager.update)
+    move_with_walls = ai_helpers._move_with_walls
+    ai_helpers._move_with_walls = timers.wrap("walls", move_with_walls)
+
+    def undo():
+        ai_helpers._move_with_walls = move_with_walls
+    return undo
+
+
+# ----------------------------------------------------------------------
+# Scenarios: each builds a world and returns a setup callable run before every tick
+# ----------------------------------------------------------------------
+def _keep_bots(world, count):
+    while len(world.bots) < count:
+        world.bots.append(spawn_bot(world.difficulty_level, world.bot_id_counter, world.walls, world.rng))
+        world.bot_id_counter += 1
+
+
+def _keep_player_alive(world):
+    world.player.health = world.player.max_health
+
+
+def bullets_vs_bots(seed):
+    """500 player bullets in flight against 50 bots."""
+    world = World(seed)
+    rng = random.Random(seed)
+    player = world.player
+
+    def setup():
+        _keep_player_alive(world)
+        _keep_bots(world, 50)
+        store = world.bullets
+        for _ in range(500 - len(store.live_indices("player"))):
+            store.add(Bullet(rng.uniform(0, WORLD_WIDTH), rng.uniform(0, WORLD_HEIGHT),
+                             rng.uniform(0, 2 * math.pi), 7.0, 10.0, 5.0, player.color, "player", player.id))
+    return world, setup
+
+
+def shotgun_spam(seed):
+    """Shotgun cannon firing every tick into 30 bots."""
+    world = World(seed)
+    player = world.player
+    player.integrate_specialization("heavy_cannon", 1)
+    player.fire_rate = 1000.0
+
+    def setup():
+        _keep_player_alive(world)
+        _keep_bots(world, 30)
+    return world, setup
+
+
+def drones_100(seed):
+    """100 drones chasing 60 bots."""
+    world = World(seed)
+    rng = random.Random(seed)
+    player = world.player
+
+    def setup():
+        _keep_player_alive(world)
+        _keep_bots(world, 60)
+        while len(player.drones) < 100:
+            player.drones.append(Drone(player.x + rng.uniform(-200, 200), player.y + rng.uniform(-200, 200),
+                                       player.id))
+    return world, setup
+
+
+def boss_special(seed):
+    """The boss fight with the boss special running the whole time."""
+    world = World(seed)
+    manager = world.boss_manager
+    manager.unlocked = True
+    manager.start_boss()
+    manager.fade_in = False
+    manager.boss_alpha = 255
+
+    def setup():
+        _keep_player_alive(world)
+        boss = manager.boss
+        boss.health = boss.max_health
+        if not boss.special_active:
+            boss._special_timer = 0
+    return world, setup
+
+
+def wall_dense(seed):
+    """Six vertical and six horizontal walls with 150 bots, most of them without LOS."""
+    world = World(seed)
+    walls = create_random_walls(seed, max_vertical=6, max_horizontal=6)
+    world.walls = walls
+    world.boss_manager.walls = walls
+    world.player.x, world.player.y = find_free_position(world.player.radius, walls, rng=world.rng.spawn)
+
+    def setup():
+        _keep_player_alive(world)
+        _keep_bots(world, 150)
+    return world, setup
+
+
+SCENARIOS = {
+    "bullets_vs_bots": bullets_vs_bots,
+    "shotgun_spam": shotgun_spam,
+    "drones_100": drones_100,
+    "boss_special": boss_special,
+    "wall_dense": wall_dense,
+}
+
+
+# ----------------------------------------------------------------------
+# Running
+# ----------------------------------------------------------------------
+def _summary(values_ms):
+    values = np.asarray(values_ms)
+    return {
+        "mean": float(values.mean()),
+        "p50": float(np.percentile(values, 50)),
+        "p95": float(np.percentile(values, 95)),
+        "max": float(values.max()),
+    }
+
+
+def run_scenario(name, ticks=DEFAULT_TICKS, seed=DEFAULT_SEED, render=True):
+    """Run one scenario and return its timings (all in milliseconds per tick)."""
+    world, setup = SCENARIOS[name](seed)
+    surface = pygame.display.get_surface() if render else None
+    font = pygame.font.SysFont(None, 24) if render else None
+    timers = SubsystemTimers()
+    undo = _instrument(world, timers)
+    draw = timers.wrap("render", draw_world)
+    tick_ms = []
+    try:
+        for tick in range(WARMUP_TICKS + ticks):
+            if tick == WARMUP_TICKS:
+                world.walls.pvs.wait()
+                timers.reset()
+            setup()
+            inp = FrameInput(fire=True, aim_angle=tick * 0.05)
+            start = time.perf_counter()
+            world.step(inp)
+            if render:
+                draw(surface, world, font)
+            if tick >= WARMUP_TICKS:
+                tick_ms.append((time.perf_counter() - start) * 1000.0)
+    finally:
+        undo()
+    return {
+        "ticks": ticks,
+        "tick_ms": _summary(tick_ms),
+        "subsystems_ms": {k: v * 1000.0 / ticks for k, v in timers.totals.items()},
+        "bots": len(world.bots),
+        "bullets": len(world.bullets),
+        "drones": len(world.player.drones),
+    }
+
+
+def run_all(names=None, ticks=DEFAULT_TICKS, seed=DEFAULT_SEED, render=True):
+    pygame.init()
+    if render:
+        pygame.display.set_mode((WIDTH, HEIGHT))
+    results = {}
+    for name in names or SCENARIOS:
+        results[name] = run_scenario(name, ticks, seed, render)
+    return {
+        "version": BENCH_VERSION,
+        "ticks": ticks,
+        "seed": seed,
+        "render": render,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scenarios": results,
+    }
+
+
+def compare(old, new, threshold=None):
+    """Return `(report_lines, regressed)` comparing two result dicts.
+
+    A scenario regresses when its mean tick time grew by more than `threshold` percent.
+    """
+    lines = []
+    regressed = False
+    for name, cur in new["scenarios"].items():
+        prev = old.get("scenarios", {}).get(name)
+        if prev is None:
+            lines.append(f"{name}: new scenario")
+            continue
+        rows = [("tick", prev["tick_ms"]["mean"], cur["tick_ms"]["mean"])]
+        rows += [(k, prev["subsystems_ms"].get(k, 0.0), v) for k, v in cur["subsystems_ms"].items()]
+        lines.append(name)
+        for label, before, after in rows:
+            change = (after - before) / before * 100.0 if before > 0 else 0.0
+            lines.append(f"  {label:<12} {before:9.3f} ms -> {after:9.3f} ms  {change:+7.1f}%")
+        tick_change = rows[0][2] / rows[0][1] * 100.0 - 100.0 if rows[0][1] > 0 else 0.0
+        if threshold is not None and tick_change > threshold:
+            regressed = True
+            lines.append(f"  REGRESSION: mean tick time +{tick_change:.1f}% (threshold {threshold}%)")
+    return lines, regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tank Game headless benchmarks")
+    parser.add_argument("--ticks", type=int, default=DEFAULT_TICKS, help="measured ticks per scenario")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="run only this scenario (repeatable)")
+    parser.add_argument("--no-render", action="store_true", help="skip drawing")
+    parser.add_argument("--output", metavar="PATH", help="write the JSON result here instead of stdout")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a previous JSON result")
+    parser.add_argument("--threshold", type=float, default=None,
+                        help="with --compare, exit 1 if a mean tick time grew by more than this percent")
+    args = parser.parse_args(argv)
+
+    result = run_all(args.scenario, args.ticks, args.seed, render=not args.no_render)
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        lines, regressed = compare(old, result, args.threshold)
+        print("\n".join(lines), file=sys.stderr)
+        return 1 if regressed else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,16 +3,17 @@ import random
 import pygame
 
 from config import WIDTH, HEIGHT, WORLD_WIDTH, WORLD_HEIGHT, FPS, WHITE
-from core import Tank, Bullet
+from core import Tank
+from projectiles import ProjectileStore
 from ai_helpers import init_bot_ai, update_bot_ai
-from walls import set_walls_visible
-from walls import set_walls_collision
-from walls import respawn_walls_avoiding_player
+from walls import respawn_walls_avoiding_player, prepare_layout
 
 class Boss(Tank):
     """A circular boss with 4 guns placed evenly around the rim."""
-    def __init__(self, x, y, player):
+    def __init__(self, x, y, player, rng=None):
         super().__init__(x, y, (200, 50, 50), False)
+        if rng is None:
+            rng = random
         # visual radius (pixels)
         self.size = 60
         self.radius = self.size
@@ -35,7 +36,7 @@ class Boss(Tank):
         self.special_active = False
         self.special_duration = 5 * FPS
         self.special_cooldown = 20 * FPS
-        self._special_timer = random.randint(FPS, self.special_cooldown)
+        self._special_timer = rng.randint(FPS, self.special_cooldown)
 
         # guns around rim
         # use 4 guns evenly spaced
@@ -96,17 +97,20 @@ class Boss(Tank):
 
 class BossManager:
     """Controls unlock UI, spawning, running, and cleanup of the boss fight."""
-    def __init__(self, player, bullets, bots, walls=None):
+    def __init__(self, player, bullets, bots, walls=None, rng=None):
         self.player = player
         self.bullets = bullets  # main bullets list
         self.bots = bots
         self.walls = walls
+        # world random streams (rng.WorldRNG); None uses the global random module
+        self.rng = rng
         # boss is locked until enough kills
         self.unlocked = False
         self.active = False
         self.boss = None
-        self.boss_bullets = []
+        self.boss_bullets = ProjectileStore()
         self.unlock_kills = 10
+        self.defeated = 0  # bosses beaten this session
         # UI rect (unused for text UI)
         self.btn_w, self.btn_h = 140, 36
         self.btn_rect = pygame.Rect(WIDTH - self.btn_w - 10, 10, self.btn_w, self.btn_h)
@@ -115,6 +119,7 @@ class BossManager:
         self.fade_in = False
         self.fade_timer = 0
         self.boss_alpha = 255
+        self.next_walls = None  # layout for after the fight, prepared when it starts
 
     def check_unlock(self, kills):
         if not self.unlocked and kills >= self.unlock_kills:
@@ -123,10 +128,13 @@ class BossManager:
     def handle_event(self, event):
         # keep mouse click support (button rect not used if text UI is used)
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            if self.unlocked and not self.active:
-                mx, my = event.pos
-                if self.btn_rect.collidepoint(mx, my):
-                    self.start_boss()
+            self.handle_click(event.pos)
+
+    def handle_click(self, pos):
+        if self.unlocked and not self.active:
+            mx, my = pos
+            if self.btn_rect.collidepoint(mx, my):
+                self.start_boss()
 
     def start_boss(self):
         # remove regular bots (clears the shared bots list so game.py sees it emptied)
@@ -136,26 +144,21 @@ class BossManager:
             self.bots = []
         # keep only player bullets
         try:
-            self.bullets[:] = [b for b in self.bullets if getattr(b, "owner", None) == "player"]
-        except Exception:
-            self.bullets = []
-        # hide walls during boss fight
-        try:
-            set_walls_visible(False)
+            self.bullets.keep_owner("player")
         except Exception:
-            pass
-        # disable wall collision during boss fight
-        try:
-            set_walls_collision(False)
-        except Exception:
-            pass
+            self.bullets.clear()
+        # hide walls and disable wall collision during boss fight
+        if self.walls is not None:
+            self.walls.visible = False
+            self.walls.collision = False
         # heal player and spawn boss
         self.player.health = getattr(self.player, "max_health", getattr(self.player, "health", 100))
         bx, by = WORLD_WIDTH // 2, WORLD_HEIGHT // 2
-        self.boss = Boss(bx, by, self.player)
+        boss_rng = self.rng.boss if self.rng is not None else None
+        self.boss = Boss(bx, by, self.player, rng=boss_rng)
         # init AI so boss obeys walls and moves like bots
         try:
-            init_bot_ai(self.boss)
+            init_bot_ai(self.boss, rng=boss_rng)
         except Exception:
             pass
         # ensure boss position is clamped
@@ -167,6 +170,8 @@ class BossManager:
         self.fade_timer = int(3 * FPS)
         self.boss_alpha = 0
         self.boss_bullets.clear()
+        # make the post-fight layout now so its visibility table builds during the fade-in
+        self.next_walls = prepare_layout(rng=self.rng.layout if self.rng is not None else None)
 
     def _boss_fire(self):
         if not self.boss:
@@ -183,49 +188,19 @@ class BossManager:
             ang = math.atan2(self.player.y - cy, self.player.x - cx)
             speed = getattr(self.boss, "bullet_speed", 6)
             dmg = getattr(self.boss, "base_damage", 20)
-            # try to match Bullet signature used in game.py; if signature differs fall back
-            try:
-                color = (255, 200, 50)
-                b = Bullet(cx, cy, ang, speed, dmg, bullet_radius, color, "boss", None)
-            except TypeError:
-                # fallback simple object
-                class _B:
-                    def __init__(self, x, y, ang, sp, dmg):
-                        self.x = x; self.y = y; self.angle = ang; self.speed = sp; self.damage = dmg; self.owner = "boss"; self.radius = bullet_radius
-                    def move(self): self.x += math.cos(self.angle) * self.speed; self.y += math.sin(self.angle) * self.speed
-                    def draw(self, win, cam_x, cam_y): pygame.draw.circle(win, (255,200,50), (int(self.x-cam_x), int(self.y-cam_y)), self.radius)
-                b = _B(cx, cy, ang, speed, dmg)
-            self.boss_bullets.append(b)
+            self.boss_bullets.spawn(cx, cy, ang, speed, dmg, bullet_radius, (255, 200, 50), "boss", None)
 
-    def _update_boss_bullets(self, win, cam_x, cam_y):
-        for b in self.boss_bullets[:]:
-            try:
-                b.move()
-            except Exception:
-                pass
-            try:
-                b.draw(win, cam_x, cam_y)
-            except Exception:
-                try:
-                    pygame.draw.circle(win, (255,200,50), (int(b.x - cam_x), int(b.y - cam_y)), getattr(b, "radius", 4))
-                except Exception:
-                    pass
-            try:
-                if math.hypot(b.x - self.player.x, b.y - self.player.y) < getattr(self.player, "radius", 20):
-                    self.player.health -= getattr(b, "damage", getattr(b, "dmg", 5))
-                    try:
-                        self.boss_bullets.remove(b)
-                    except ValueError:
-                        pass
-            except Exception:
-                pass
-            if getattr(b, "x", 0) < -100 or getattr(b, "x", 0) > WORLD_WIDTH + 100 or getattr(b, "y", 0) < -100 or getattr(b, "y", 0) > WORLD_HEIGHT + 100:
-                try:
-                    self.boss_bullets.remove(b)
-                except ValueError:
-                    pass
+    def _update_boss_bullets(self):
+        store = self.boss_bullets
+        store.move()
+        for i in store.circle_hits(self.player.x, self.player.y, getattr(self.player, "radius", 20)).tolist():
+            self.player.health -= float(store.damage[i])
+            store.alive[i] = False
+        store.expire()
+        store.compact()
 
-    def update(self, win, cam_x, cam_y, font):
+    def update(self):
+        """Advance the boss fight by one frame. Drawing is done separately in `draw`."""
         # If boss not active don't run fight logic here
         if not self.active:
             return
@@ -237,10 +212,6 @@ class BossManager:
             remaining = max(0, self.fade_timer)
             alpha = int(((total - remaining) / total) * 255)
             self.boss_alpha = max(0, min(255, alpha))
-            try:
-                self.boss.draw(win, cam_x, cam_y, alpha=self.boss_alpha)
-            except Exception:
-                pass
             if self.fade_timer <= 0:
                 self.fade_in = False
                 self.boss_alpha = 255
@@ -249,7 +220,8 @@ class BossManager:
         # Movement: prefer using bot AI so boss obeys walls and spacing
         try:
             try:
-                _ = update_bot_ai(self.boss, self.bots, self.player, walls=self.walls)
+                _ = update_bot_ai(self.boss, self.bots, self.player, walls=self.walls,
+                                  rng=self.rng.boss if self.rng is not None else None)
             except TypeError:
                 _ = update_bot_ai(self.boss, self.bots, self.player)
         except Exception:
@@ -287,31 +259,32 @@ class BossManager:
         else:
             self.boss.fire_cooldown -= 1
 
-        # render boss and its bullets
+        self._update_boss_bullets()
+
+        # player bullets hitting boss
+        for i in self.bullets.circle_hits(self.boss.x, self.boss.y, self.boss.size * 1.4, "player").tolist():
+            self.boss.health -= float(self.bullets.damage[i])
+            self.bullets.alive[i] = False
+            if self.boss.health <= 0:
+                self.bullets.compact()
+                self.end_boss_fight()
+                return
+        self.bullets.compact()
+
+    def draw(self, win, cam_x, cam_y, view=None):
+        """Render the boss (faded in while spawning) and its bullets."""
+        if not self.active or self.boss is None:
+            return
         try:
-            self.boss.draw(win, cam_x, cam_y)
+            # size + gun circles + health bar
+            if view is None or view.visible(self.boss.x, self.boss.y, self.boss.size + 14):
+                self.boss.draw(win, cam_x, cam_y, alpha=self.boss_alpha)
         except Exception:
             pass
-        self._update_boss_bullets(win, cam_x, cam_y)
-
-        # player bullets hitting boss
-        for b in list(self.bullets):
-            try:
-                if getattr(b, "owner", None) == "player":
-                    dist = math.hypot(getattr(b, "x", 0) - self.boss.x, getattr(b, "y", 0) - self.boss.y)
-                    if dist < (self.boss.size * 1.4):
-                        self.boss.health -= getattr(b, "damage", getattr(b, "dmg", 5))
-                        try:
-                            self.bullets.remove(b)
-                        except ValueError:
-                            pass
-                        if self.boss.health <= 0:
-                            self.end_boss_fight()
-                            return
-            except Exception:
-                continue
+        self.boss_bullets.draw(win, cam_x, cam_y, view)
 
     def end_boss_fight(self):
+        self.defeated += 1
         try:
             self.player.exp += 50
         except Exception:
@@ -319,21 +292,18 @@ class BossManager:
         self.boss_bullets.clear()
         self.active = False
         self.boss = None
-        # restore walls after boss is defeated
-        try:
-            set_walls_visible(True)
-        except Exception:
-            pass
-        # re-enable wall collision after boss fight
-        try:
-            set_walls_collision(True)
-        except Exception:
-            pass
+        # restore walls and wall collision after boss is defeated
+        if self.walls is not None:
+            self.walls.visible = True
+            self.walls.collision = True
         # respawn walls, avoiding player position
         try:
             if self.walls is not None and self.player is not None:
-                respawn_walls_avoiding_player(self.walls, self.player)
+                respawn_walls_avoiding_player(self.walls, self.player,
+                                              rng=self.rng.layout if self.rng is not None else None,
+                                              layout=self.next_walls)
         except Exception:
             pass
+        self.next_walls = None
         # unlocked remains True for replay
 
@@ -15,7 +15,9 @@ GREY = (120, 120, 120)
 BG_COLOR = (30, 30, 30)
 
 # Game constants
-FPS = 60
+FPS = 60  # simulation ticks per second; all speeds and cooldowns are per tick
+MAX_TICKS_PER_FRAME = 5  # catch-up ticks run before a rendered frame at most
+MAX_SKIPPED_FRAMES = 3   # rendered frames that may be skipped in a row while catching up
 BOT_SPAWN_RATE = 50  # frames between bot spawns
 UPGRADE_COST = 5
 MAX_BOTS = 5
@@ -29,6 +31,9 @@ DRONE_SPAWN_INTERVAL_FRAMES = FPS * 1.5  # every ~1.5 seconds (2x frequency)
 DRONE_LIFETIME_FRAMES = FPS * 20       # ~20 seconds
 DRONE_RADIUS = 6
 
+# Projectile lifecycle
+BULLET_WORLD_MARGIN = 100          # bullets farther than this outside the world expire
+
 # Barrel rendering scale factors
 BARREL_LENGTH_SCALE = 5.0   # pixels per bullet_speed
 BARREL_WIDTH_BASE = 3       # base width in pixels
@@ -1,5 +1,6 @@
 import math
 import pygame
+from collections import OrderedDict
 from dataclasses import dataclass
 from config import (
     WIDTH, HEIGHT, WORLD_WIDTH, WORLD_HEIGHT, WHITE, RED, GREEN, BLUE, YELLOW, ORANGE, CYAN, MAGENTA, GREY, BG_COLOR,
@@ -7,7 +8,41 @@ from config import (
     DRONE_SPEED, DRONE_DAMAGE, DRONE_SPAWN_INTERVAL_FRAMES, DRONE_LIFETIME_FRAMES, DRONE_RADIUS
 )
 from upgrades import BulletProfile, GunMount, DroneSpawnerMount, specialization_tree, shotgun_profiles
-from walls import resolve_circle_against_walls
+from walls import resolve_circle_against_walls, walls_block_move
+from spatial import SpatialHash, TARGET_CELL_SIZE
+
+# Bot count from which drones find targets through a spatial index instead of a scan
+DRONE_INDEX_MIN_BOTS = 32
+
+# Rotated barrel sprites, keyed by (length, width, color, angle bucket), least recently
+# used first. Barrels are drawn at angles rounded to BARREL_ANGLE_STEP degrees.
+BARREL_ANGLE_STEP = 1
+BARREL_SPRITE_CACHE_SIZE = 512
+_barrel_sprites = OrderedDict()
+
+
+def barrel_sprite(length, width, color, ang):
+    """Return the barrel rectangle of the given size and colour rotated to `ang` radians."""
+    bucket = round(-math.degrees(ang) / BARREL_ANGLE_STEP) % (360 // BARREL_ANGLE_STEP)
+    key = (length, width, tuple(color), bucket)
+    sprite = _barrel_sprites.get(key)
+    if sprite is not None:
+        _barrel_sprites.move_to_end(key)
+        return sprite
+    barrel_surface = pygame.Surface((length, width), pygame.SRCALPHA)
+    barrel_surface.fill(color)
+    sprite = pygame.transform.rotate(barrel_surface, bucket * BARREL_ANGLE_STEP)
+    if pygame.display.get_surface() is not None:
+        sprite = sprite.convert_alpha()
+    _barrel_sprites[key] = sprite
+    if len(_barrel_sprites) > BARREL_SPRITE_CACHE_SIZE:
+        _barrel_sprites.popitem(last=False)
+    return sprite
+
+
+def clear_barrel_sprites():
+    """Drop every cached barrel sprite (call after upgrades change barrel sizes)."""
+    _barrel_sprites.clear()
 
 @dataclass
 class Bullet:
@@ -41,15 +76,19 @@ class Drone:
         self.life = DRONE_LIFETIME_FRAMES
         self.color = CYAN
 
-    def target_nearest(self, bots):
+    def target_nearest(self, bots, index=None):
+        if index is not None:
+            # shared per-frame SpatialHash of the bots (see Tank.update_drones)
+            entry = index.nearest(self.x, self.y)
+            return entry[1] if entry is not None else None
         if not bots:
             return None
         nearest = min(bots, key=lambda b: (b.x - self.x)**2 + (b.y - self.y)**2)
         return nearest
 
-    def update(self, bots):
+    def update(self, bots, index=None):
         self.life -= 1
-        target = self.target_nearest(bots)
+        target = self.target_nearest(bots, index)
         if target is not None:
             ang = math.atan2(target.y - self.y, target.x - self.x)
             # move axis-by-axis so walls can be resolved (passed-in via update caller)
@@ -126,22 +165,17 @@ class Tank:
             self.y -= self.speed
         if keys[pygame.K_s]:
             self.y += self.speed
-        if walls:
-            for w in walls:
-                if w.collides_circle(self.x, self.y, self.radius):
-                    self.y = orig_y
-                    break
+        # swept test, so high speed upgrades cannot step over a thin wall
+        if walls and walls_block_move(walls, orig_x, orig_y, self.x, self.y, self.radius):
+            self.y = orig_y
 
         # Horizontal movement
         if keys[pygame.K_a]:
             self.x -= self.speed
         if keys[pygame.K_d]:
             self.x += self.speed
-        if walls:
-            for w in walls:
-                if w.collides_circle(self.x, self.y, self.radius):
-                    self.x = orig_x
-                    break
+        if walls and walls_block_move(walls, orig_x, self.y, self.x, self.y, self.radius):
+            self.x = orig_x
 
         # Keep within world bounds
         self.x = max(0, min(WORLD_WIDTH, self.x))
@@ -166,7 +200,12 @@ class Tank:
             frames_per_shot = max(1, int(FPS / self.fire_rate))
             self.fire_cooldown = frames_per_shot
 
-    def fire(self, aim_angle, owner_label, owner_id):
+    def fire(self, aim_angle, owner_label, owner_id, store=None):
+        """Fire one bullet per gun mount.
+
+        Bullets are appended to `store` (a `ProjectileStore`) when given, otherwise a list
+        of `Bullet` objects is returned.
+        """
         bullets = []
         for mount in self.gun_mounts:
             # Determine emission angle
@@ -178,6 +217,10 @@ class Tank:
 
             # Use the mount's bullet profile
             prof = mount.profile
+            if store is not None:
+                store.spawn(self.x, self.y, emit_angle, prof.speed, prof.damage, prof.radius,
+                            prof.color, owner_label, owner_id)
+                continue
             bullets.append(Bullet(
                 self.x, self.y,
                 emit_angle,
@@ -225,13 +268,32 @@ class Tank:
                 self.drones.append(Drone(spawn_x, spawn_y, self.id))
             self.drone_spawn_timer = DRONE_SPAWN_INTERVAL_FRAMES
 
-    def update_drones(self, bots, win, cam_x, cam_y, walls=None):
-        for d in self.drones[:]:
+    def update_drones(self, bots, walls=None):
+        if not self.drones:
+            return
+        # Bots don't move while drones update, so index them once for every drone
+        # (a plain scan is cheaper for the usual handful of bots)
+        index = None
+        if bots and len(bots) >= DRONE_INDEX_MIN_BOTS:
+            # about one bot per cell keeps the ring search short for any bot count
+            index = SpatialHash(max(TARGET_CELL_SIZE, math.sqrt(WORLD_WIDTH * WORLD_HEIGHT / len(bots))))
+            for b in bots:
+                index.insert(b, b.x, b.y)
+        for d in self.drones:
             # Drones can move through walls; call update without attaching walls
-            d.update(bots)
-            d.draw(win, cam_x, cam_y)
-            if d.life <= 0:
-                self.drones.remove(d)
+            d.update(bots, index)
+        # drop expired drones in one pass
+        self.drones[:] = [d for d in self.drones if d.life > 0]
+
+    def draw_drones(self, win, cam_x, cam_y, view=None):
+        for d in self.drones:
+            if view is None or view.visible(d.x, d.y, d.radius):
+                d.draw(win, cam_x, cam_y)
+
+    def draw_extent(self):
+        """Radius around the tank centre that its drawing (barrels, health bar) can reach."""
+        longest = max((m.profile.speed for m in self.gun_mounts), default=0.0) * BARREL_LENGTH_SCALE
+        return self.radius + max(longest, 16)
 
     def draw(self, win, cam_x, cam_y, aim_angle):
         screen_x = int(self.x - cam_x)
@@ -281,10 +343,7 @@ class Tank:
                 # skip other shotgun mounts
             else:
                 # Normal barrels
-                barrel_surface = pygame.Surface((length, width), pygame.SRCALPHA)
-                barrel_surface.fill(self.color)
-
-                rotated = pygame.transform.rotate(barrel_surface, -math.degrees(ang))
+                rotated = barrel_sprite(length, width, self.color, ang)
                 rect = rotated.get_rect(center=(screen_x + math.cos(ang) * (self.radius - 2),
                                                 screen_y + math.sin(ang) * (self.radius - 2)))
                 win.blit(rotated, rect)
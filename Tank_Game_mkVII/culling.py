@@ -0,0 +1,54 @@
+"""View-frustum culling for rendering.
+
+A `ViewCuller` holds the camera rectangle for the frame being drawn and decides which
+entities are close enough to it to be worth drawing. It also counts how many entities
+were drawn and how many were skipped, for profiling.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from config import WIDTH, HEIGHT
+
+# Extra space around the view so partly visible entities (barrels, health bars) still draw
+CULL_MARGIN = 16
+
+
+class ViewCuller:
+    """Camera rectangle plus drawn/culled counters for one frame."""
+
+    def __init__(self, margin: float = CULL_MARGIN):
+        self.margin = margin
+        self.left = self.top = 0.0
+        self.right = float(WIDTH)
+        self.bottom = float(HEIGHT)
+        self.drawn = 0
+        self.culled = 0
+
+    def begin(self, cam_x, cam_y, width=WIDTH, height=HEIGHT):
+        """Set the camera rectangle for a new frame and reset the counters."""
+        m = self.margin
+        self.left = cam_x - m
+        self.top = cam_y - m
+        self.right = cam_x + width + m
+        self.bottom = cam_y + height + m
+        self.drawn = 0
+        self.culled = 0
+
+    def visible(self, x, y, radius=0.0):
+        """Return True if a circle of `radius` at world (x, y) may show on screen."""
+        if x + radius < self.left or x - radius > self.right or y + radius < self.top or y - radius > self.bottom:
+            self.culled += 1
+            return False
+        self.drawn += 1
+        return True
+
+    def visible_mask(self, x, y, radius=0.0):
+        """Vectorized `visible` for arrays of positions (and radii)."""
+        mask = ~((x + radius < self.left) | (x - radius > self.right)
+                 | (y + radius < self.top) | (y - radius > self.bottom))
+        drawn = int(np.count_nonzero(mask))
+        self.drawn += drawn
+        self.culled += len(mask) - drawn
+        return mask
@@ -1,497 +1,396 @@
 import sys
 import math
-import random
+import time
+import argparse
 import pygame
 
 from config import (
-    WIDTH, HEIGHT, WORLD_WIDTH, WORLD_HEIGHT, WHITE, RED, GREEN, BG_COLOR, FPS,
-    BOT_SPAWN_RATE, MAX_BOTS, UPGRADE_COST, KILLS_PER_LEVEL, LEVELS_PER_SPECIALIZATION
+    WIDTH, HEIGHT, WORLD_WIDTH, WORLD_HEIGHT, WHITE, RED, BG_COLOR, FPS,
+    MAX_TICKS_PER_FRAME, MAX_SKIPPED_FRAMES
 )
-from core import Tank, Bullet, render_bullet
-from ai_helpers import init_bot_ai, update_bot_ai
-from upgrades import specialization_tree, root_defaults
-from walls import create_random_walls, draw_walls, line_of_sight
-from boss import BossManager
-
-def reset_game():
-    # Create walls first so we can pick valid spawn positions
-    walls = create_random_walls()
-
-    # find a safe spawn position for the player
-    player_radius = 20
-    px, py = None, None
-    try:
-        from walls import find_free_position
-        px, py = find_free_position(player_radius, walls)
-    except Exception:
-        px, py = WORLD_WIDTH // 2, WORLD_HEIGHT // 2
-
-    player = Tank(px, py, WHITE, True)
-    player.id = -1
-    player.drone_spawn_timer = 0
-    player.bot_kills = 0  # Ensure bot_kills exists for BossManager
-    bullets = []
-    bots = []
-    frame_count = 0
-    game_over = False
-    difficulty_level = 1
-    show_specialization_menu = False
-    bot_id_counter = 0
-    shotgun_mode = False
-    
-    # Initialize BossManager
-    boss_manager = BossManager(player, bullets, bots, walls)
-    
-    return player, bullets, bots, frame_count, game_over, difficulty_level, show_specialization_menu, bot_id_counter, walls, boss_manager
-
-def spawn_bot(difficulty_level, bot_id, walls):
-    # choose a spawn point that doesn't overlap walls
-    bot_radius = 20
-    try:
-        from walls import find_free_position
-        bx, by = find_free_position(bot_radius, walls)
-    except Exception:
-        bx, by = random.randint(bot_radius, WORLD_WIDTH - bot_radius), random.randint(bot_radius, WORLD_HEIGHT - bot_radius)
-    bot = Tank(bx, by, GREEN)
-    bot.id = bot_id
-    # scale stats with difficulty
-    bot.base_bullet_speed += difficulty_level * 0.3
-    bot.base_damage += difficulty_level * 2.0
-    bot.speed += difficulty_level * 0.2
-    bot.fire_rate = 1.0 + 0.1 * difficulty_level  # bots also get faster fire rates
-    # mounts: single aim gun using bot's base profile color
-    bot.gun_mounts = bot.gun_mounts[:1]  # keep one mount
-    bot.cooldown = 0
-    init_bot_ai(bot)
-    return bot
+from walls import draw_walls
+from culling import ViewCuller
+from world import World, FrameInput, reset_game, spawn_bot  # noqa: F401 (re-exported)
+from turbo import run_turbo, format_report, TURBO_MAX_TICKS
+from replay import InputRecorder, replay, format_report as format_replay_report
+from profiler import profiler
+from telemetry import TelemetryWriter, GCCounter, entity_counts, format_summary
+from gcmanager import gc_manager, format_summary as format_gc_summary
+
 #Nathan Chong {
-def draw_border(win, cam_x, cam_y, player_x, player_y):
-    """Draw dashed slant border lines that fade based on proximity to edges."""
-    threshold = 200  # pixels from edge to start fading in
-    dash_length = 20
-    gap_length = 10
-    slant_angle = math.pi / 4  
+# Pre-rendered dashed edge strips per world size: {(w, h): {edge: (surface, (x, y))}}
+_border_strips = {}
 
-    # Distances to edges
-    dist_left = player_x
-    dist_right = WORLD_WIDTH - player_x
-    dist_top = player_y
-    dist_bottom = WORLD_HEIGHT - player_y
 
-    # Create a surface for the border with alpha
-    border_surf = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+def _render_border_strips(world_w, world_h):
+    """Render each dashed slant edge once, at full opacity, into its own strip surface."""
+    dash_length = 20
+    gap_length = 10
+    slant_angle = math.pi / 4
 
-    # Helper to draw dashed slant line along an edge
-    def draw_dashed_slant(start_x, start_y, end_x, end_y, color, alpha, direction):
+    # Helper to build the dash segments along an edge (world coordinates)
+    def dashed_slant(start_x, start_y, end_x, end_y, direction):
         # direction: 1 for /, -1 for \
         dx = end_x - start_x
         dy = end_y - start_y
         length = math.hypot(dx, dy)
         if length == 0:
-            return
+            return []
         num_dashes = int(length / (dash_length + gap_length))
+        segments = []
         for i in range(num_dashes):
             pos = i * (dash_length + gap_length) / length
             x1 = start_x + dx * pos
             y1 = start_y + dy * pos
             x2 = x1 + math.cos(slant_angle) * dash_length * direction
             y2 = y1 + math.sin(slant_angle) * dash_length * direction
-            pygame.draw.line(border_surf, (*color, alpha), (x1 - cam_x, y1 - cam_y), (x2 - cam_x, y2 - cam_y), 2)
-
-    # Top edge (slanting down-right)
-    if dist_top < threshold:
-        alpha = int(255 * (1 - dist_top / threshold))
-        draw_dashed_slant(0, 0, WORLD_WIDTH, 0, WHITE, alpha, 1)
-
-    # Bottom edge (slanting up-right)
-    if dist_bottom < threshold:
-        alpha = int(255 * (1 - dist_bottom / threshold))
-        draw_dashed_slant(0, WORLD_HEIGHT, WORLD_WIDTH, WORLD_HEIGHT, WHITE, alpha, -1)
-
-    # Left edge (slanting down-right)
-    if dist_left < threshold:
-        alpha = int(255 * (1 - dist_left / threshold))
-        draw_dashed_slant(0, 0, 0, WORLD_HEIGHT, WHITE, alpha, 1)
-
-    # Right edge (slanting down-left)
-    if dist_right < threshold:
-        alpha = int(255 * (1 - dist_right / threshold))
-        draw_dashed_slant(WORLD_WIDTH, 0, WORLD_WIDTH, WORLD_HEIGHT, WHITE, alpha, -1)
-
-    # Blit the border surface
-    win.blit(border_surf, (0, 0))
+            segments.append((x1, y1, x2, y2))
+        return segments
+
+    edges = {
+        'top': dashed_slant(0, 0, world_w, 0, 1),  # slanting down-right
+        'bottom': dashed_slant(0, world_h, world_w, world_h, -1),  # slanting up-right
+        'left': dashed_slant(0, 0, 0, world_h, 1),  # slanting down-right
+        'right': dashed_slant(world_w, 0, world_w, world_h, -1),  # slanting down-left
+    }
+    strips = {}
+    pad = 2  # room for the 2px line width
+    for edge, segments in edges.items():
+        if not segments:
+            continue
+        xs = [v for seg in segments for v in (seg[0], seg[2])]
+        ys = [v for seg in segments for v in (seg[1], seg[3])]
+        ox = math.floor(min(xs)) - pad
+        oy = math.floor(min(ys)) - pad
+        surf = pygame.Surface((math.ceil(max(xs)) + pad - ox, math.ceil(max(ys)) + pad - oy), pygame.SRCALPHA)
+        for x1, y1, x2, y2 in segments:
+            pygame.draw.line(surf, WHITE, (x1 - ox, y1 - oy), (x2 - ox, y2 - oy), 2)
+        strips[edge] = (surf, (ox, oy))
+    return strips
+
+
+def draw_border(win, cam_x, cam_y, player_x, player_y):
+    """Draw dashed slant border lines that fade based on proximity to edges."""
+    threshold = 200  # pixels from edge to start fading in
+
+    strips = _border_strips.get((WORLD_WIDTH, WORLD_HEIGHT))
+    if strips is None:
+        strips = _border_strips[(WORLD_WIDTH, WORLD_HEIGHT)] = _render_border_strips(WORLD_WIDTH, WORLD_HEIGHT)
+
+    # Distances to edges
+    distances = {
+        'top': player_y,
+        'bottom': WORLD_HEIGHT - player_y,
+        'left': player_x,
+        'right': WORLD_WIDTH - player_x,
+    }
+    for edge, dist in distances.items():
+        if dist < threshold and edge in strips:
+            # fade the cached strip instead of redrawing it
+            surf, (ox, oy) = strips[edge]
+            surf.set_alpha(int(255 * (1 - dist / threshold)))
+            win.blit(surf, (ox - cam_x, oy - cam_y))
 #Nathan Chong }
-def main():
+# Culls off-screen entities while drawing; its drawn/culled counters describe the last frame
+view_culler = ViewCuller()
+
+
+def draw_world(win, world, font, view=view_culler):
+    """Render the current world state. Reads the world but never advances it."""
+    player = world.player
+    win.fill(BG_COLOR)
+    cam_x, cam_y = world.camera()
+    view.begin(cam_x, cam_y)
+    with profiler.stage("border"):
+        draw_border(win, cam_x, cam_y, player.x, player.y)
+    # Draw walls
+    with profiler.stage("walls"):
+        draw_walls(win, world.walls, cam_x, cam_y)
+
+    if world.game_over:
+        over_text = font.render("GAME OVER - Press R to Restart", True, RED)
+        win.blit(over_text, (WIDTH//2 - 120, HEIGHT//2))
+        return
+
+    # Draw player (with barrels and spawners) and its drones
+    with profiler.stage("tanks"):
+        player.draw(win, cam_x, cam_y, world.aim_angle)
+        player.draw_drones(win, cam_x, cam_y, view)
+        for bot in world.bots:
+            if not view.visible(bot.x, bot.y, bot.draw_extent()):
+                continue
+            ang_to_player = math.atan2(player.y - bot.y, player.x - bot.x)
+            bot.draw(win, cam_x, cam_y, ang_to_player)
+    with profiler.stage("projectiles"):
+        world.bullets.draw(win, cam_x, cam_y, view)
+    with profiler.stage("boss_draw"):
+        world.boss_manager.draw(win, cam_x, cam_y, view)
+
+    with profiler.stage("hud"):
+        draw_hud(win, world, font)
+
+
+def draw_profiler_overlay(win, world, font, view=view_culler):
+    """Draw the F3 profiler overlay: stage timings plus entity counts."""
+    boss_manager = world.boss_manager
+    profiler.draw(win, font, (
+        ("bullets", len(world.bullets)),
+        ("bots", len(world.bots)),
+        ("drones", len(world.player.drones)),
+        ("boss bullets", len(boss_manager.boss_bullets)),
+        ("culled", view.culled),
+        ("gc ms", f"{sum(ms for _, ms in gc_manager.last_pauses):.2f}"),
+    ))
+
+
+def draw_hud(win, world, font):
+    player = world.player
+    boss_manager = world.boss_manager
+    hud1 = font.render(
+        f"EXP: {player.exp} | Kills: {player.bot_kills} | Level: {player.level} | Diff: {world.difficulty_level}",
+        True, WHITE
+    )
+    hud2 = font.render(
+        "Upgrades: 1-Speed 2-BulletSpd 3-Damage 4-Health 5-FireRate (Cost: 5 EXP each)",
+        True, WHITE
+    )
+    # Debug HUD: show whether rapid unlock is active
+    debug_text = font.render(f"RapidUnlock: {'ON' if world.rapid_unlock else 'OFF'} (F2) | Profiler: F3", True, WHITE)
+    win.blit(hud1, (10, 10))
+    win.blit(hud2, (10, 30))
+    win.blit(debug_text, (10, 50))
+
+    # Boss UI text (appears when boss unlocked and not active)
+    if boss_manager.unlocked and not boss_manager.active:
+        t1 = font.render("BOSS FIGHT AVAILABLE", True, WHITE)
+        t2 = font.render("CLICK 0 TO START", True, WHITE)
+        margin = 10
+        # bottom-left: stack t1 above t2 with a small margin from bottom edge
+        t2_y = HEIGHT - margin - t2.get_height()
+        t1_y = t2_y - 4 - t1.get_height()
+        win.blit(t1, (margin, t1_y))
+        win.blit(t2, (margin, t2_y))
+
+    if world.show_specialization_menu:
+        draw_specialization_menu(win, world, font)
+
+
+def draw_specialization_menu(win, world, font):
+    # Render either the root selection (1..4) or the chosen root's options (1..2)
+    # Color map for each branch
+    branch_colors = {
+        "dual_barrel": (255, 200, 100),      # Orange
+        "twin_gun": (100, 200, 255),         # Light blue
+        "heavy_cannon": (255, 100, 100),     # Red
+        "sniper_barrel": (150, 255, 150),    # Light green
+    }
+    current_tree = world.current_tree
+
+    if world.specialization_stage == 'root' or world.specialization_stage is None:
+        # Root selection menu
+        title_text = font.render("Select Specialization Branch:", True, WHITE)
+        roots_text = "1: Dual Barrel   2: Twin Gun   3: Heavy Cannon   4: Sniper Barrel"
+        root_text = font.render(roots_text, True, WHITE)
+
+        # Calculate positioning for centered menu
+        title_rect = title_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 60))
+        root_rect = root_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 20))
+
+        # Draw semi-transparent background
+        bg_surf = pygame.Surface((root_rect.width + 40, root_rect.height + 100), pygame.SRCALPHA)
+        bg_surf.fill((0, 0, 0, 180))
+        win.blit(bg_surf, (WIDTH // 2 - (root_rect.width + 40) // 2, HEIGHT // 2 - 80))
+
+        win.blit(title_text, title_rect)
+        win.blit(root_text, root_rect)
+
+    elif world.specialization_stage == 'option' and current_tree is not None:
+        # Option selection menu
+        branch_color = branch_colors.get(world.pending_root, WHITE)
+
+        title_text = font.render(f"{current_tree['label']} Specialization", True, branch_color)
+        opt1_text = f"1: {current_tree['options'][0]['label']}"
+        opt2_text = f"2: {current_tree['options'][1]['label']}"
+        opt1_render = font.render(opt1_text, True, WHITE)
+        opt2_render = font.render(opt2_text, True, WHITE)
+
+        # Calculate positioning for centered menu
+        title_rect = title_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 60))
+        opt1_rect = opt1_render.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 10))
+        opt2_rect = opt2_render.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 20))
+
+        # Draw semi-transparent background with branch color tint
+        max_width = max(opt1_rect.width, opt2_rect.width, title_rect.width) + 40
+        bg_surf = pygame.Surface((max_width, 130), pygame.SRCALPHA)
+        bg_color = (*branch_color, 180)  # Add alpha channel
+        bg_surf.fill(bg_color)
+        win.blit(bg_surf, (WIDTH // 2 - max_width // 2, HEIGHT // 2 - 80))
+
+        win.blit(title_text, title_rect)
+        win.blit(opt1_render, opt1_rect)
+        win.blit(opt2_render, opt2_rect)
+
+
+def read_input(world):
+    """Poll pygame for this frame's input and translate it into a FrameInput."""
+    keys = pygame.key.get_pressed()
+    mouse_x, mouse_y = pygame.mouse.get_pos()
+    cam_x, cam_y = world.camera()
+    inp = FrameInput(
+        up=keys[pygame.K_w],
+        down=keys[pygame.K_s],
+        left=keys[pygame.K_a],
+        right=keys[pygame.K_d],
+        aim=(mouse_x + cam_x, mouse_y + cam_y),
+        fire=pygame.mouse.get_pressed()[0],
+    )
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT:
+            pygame.quit()
+            sys.exit()
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            inp.clicks.append(event.pos)
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_F3:
+                # the profiler overlay is not part of the game, so F3 never reaches the world
+                profiler.toggle()
+                continue
+            inp.keys.append(event.key)
+    return inp
+
+
+def main(render_fps=FPS, seed=None, record=None, telemetry=None):
+    """Run the game with a fixed simulation tick of 1/FPS s, rendering at `render_fps`.
+
+    Each rendered frame runs however many ticks of simulation time have passed (at most
+    MAX_TICKS_PER_FRAME), then draws the world interpolated between the last two ticks,
+    so game speed no longer depends on how fast frames are drawn. While the simulation
+    is behind, up to MAX_SKIPPED_FRAMES frames in a row skip drawing to catch up.
+
+    With `record` (a file path) the input of every tick is written there for `--replay`;
+    with `telemetry` (a .jsonl or .csv path) one record per drawn frame is written there
+    and a frame-time summary printed on exit.
+    """
     pygame.init()
     WIN = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("Tank Battle")
     clock = pygame.time.Clock()
     font = pygame.font.SysFont(None, 24)
 
-    player, bullets, bots, frame_count, game_over, difficulty_level, show_specialization_menu, bot_id_counter, walls, boss_manager = reset_game()
-
-    # Debug / temporary testing toggle: press F2 to enable rapid unlock (kills-per-level = 1)
-    rapid_unlock = False
-
-    aim_angle = 0.0
-    current_tree = None
-    current_options = None
-    shotgun_active = False
-    # Specialization menu stage: None | 'root' | 'option'
-    specialization_stage = None
-    pending_root = None
-    specializations_shown = 0  # Count how many specialization menus have been shown to the player
-    kills_at_last_specialization = 0  # Track kill count when last specialization menu was shown
+    gc_manager.install()
+    world = World(seed)
+    recorder = InputRecorder(record, world.rng.seed) if record else None
+    writer = TelemetryWriter(telemetry) if telemetry else None
+    if writer is not None:
+        profiler.set_collect(True)
+    try:
+        _run_loop(WIN, world, font, clock, render_fps, recorder, writer)
+    finally:
+        if recorder is not None:
+            recorder.close()
+        if writer is not None:
+            profiler.set_collect(False)
+            print(format_summary(writer.close()))
+            print(format_gc_summary(gc_manager.summary()))
+        gc_manager.uninstall()
+
+
+def _run_loop(WIN, world, font, clock, render_fps, recorder, writer):
+    gc_counter = GCCounter() if writer is not None else None
+    frame = 0
+    frame_start = None  # skipped frames count toward the next drawn one
+    tick_seconds = 1.0 / FPS
+    accumulator = 0.0
+    skipped = 0
+    pending = FrameInput()  # key presses and clicks waiting for the next tick
 
     while True:
-        clock.tick(FPS)
-        WIN.fill(BG_COLOR)
-        keys = pygame.key.get_pressed()
-        mouse_x, mouse_y = pygame.mouse.get_pos()
-        cam_x = player.x - WIDTH // 2
-        cam_y = player.y - HEIGHT // 2
-        draw_border(WIN, cam_x, cam_y, player.x, player.y)
-        # Draw walls
-        draw_walls(WIN, walls, cam_x, cam_y)
-
-        # Events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            
-            # Handle boss manager events (mouse support kept for compatibility)
-            boss_manager.handle_event(event)
-            
-            # Start boss with key 0 when available
-            if event.type == pygame.KEYDOWN and event.key == pygame.K_0:
-                if not game_over and boss_manager.unlocked and not boss_manager.active and not show_specialization_menu:
-                    boss_manager.start_boss()
-                    # consume this event so it doesn't fall through into other handlers
-                    continue
-            
-            if game_over and event.type == pygame.KEYDOWN and event.key == pygame.K_r:
-                player, bullets, bots, frame_count, game_over, difficulty_level, show_specialization_menu, bot_id_counter, walls, boss_manager = reset_game()
-                shotgun_active = False
-                current_tree = None
-                current_options = None
-                kills_at_last_specialization = 0
-                specialization_stage = None
-                pending_root = None
-                specializations_shown = 0
-            if not game_over:
-                if show_specialization_menu and event.type == pygame.KEYDOWN:
-                    # Two-stage specialization selection:
-                    # Stage 'root' -> player picks one of the root branches (1..4)
-                    # Stage 'option' -> player picks the chosen branch's option (1..2)
-                    root_order = ["dual_barrel", "twin_gun", "heavy_cannon", "sniper_barrel"]
-
-                    # ensure stage set
-                    if specialization_stage is None:
-                        specialization_stage = 'root'
-
-                    if specialization_stage == 'root':
-                        # Root selection uses keys 1..4. Apply the root immediately and resume gameplay.
-                        if event.key in (pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4):
-                            idx = {pygame.K_1:0, pygame.K_2:1, pygame.K_3:2, pygame.K_4:3}[event.key]
-                            root_key = root_order[idx]
-                            # apply root-default mounts immediately
-                            mounts, shot_flag = root_defaults(root_key, player.color)
-                            # replace player's mounts and clear spawners
-                            player.gun_mounts = mounts
-                            player.drone_spawner_mounts = []
-                            player.spec_key = root_key
-                            shotgun_active = shot_flag
-                            # Apply shotgun modifier flag to the player (affects firing)
-                            player.is_shotgun = shot_flag
-                            # close menu and resume gameplay; do not increment specialization_count yet
-                            show_specialization_menu = False
-                            specialization_stage = None
-                            pending_root = None
-                            continue
-
-                    elif specialization_stage == 'option':
-                        # Option selection uses keys 1..2
-                        if event.key in (pygame.K_1, pygame.K_2) and pending_root is not None:
-                            chosen = 0 if event.key == pygame.K_1 else 1
-                            print(f"DEBUG: CLOSING SPECIALIZATION MENU. kills_at_last_specialization={kills_at_last_specialization}")
-                            player.integrate_specialization(pending_root, chosen)
-                            shotgun_active = current_options[chosen].get('shotgun', False)
-                            # Apply shotgun modifier to the player (affects firing)
-                            player.is_shotgun = shotgun_active
-                            show_specialization_menu = False
-                            specialization_stage = None
-                            pending_root = None
-                            # clear stored root since we've finalized the option
-                            player.spec_key = None
-                            # Mark full specialization complete to prevent future branches
-                            player.specialization_complete = True
-                            # increment specialization count now that selection is finalized
-                            player.specialization_count += 1
-                            specializations_shown += 1
-                            # Consume this event
-                            continue
-
-                elif event.type == pygame.KEYDOWN:
-                    # Debug: toggle rapid unlock (press F2)
-                    if event.key == pygame.K_F2:
-                        rapid_unlock = not rapid_unlock
-                        continue
-
-                    # Stat upgrades for 5 EXP (only if specialization menu is NOT open)
-                    if not show_specialization_menu and player.exp >= UPGRADE_COST:
-                        if event.key == pygame.K_1:
-                            player.speed += 0.5
-                            player.exp -= UPGRADE_COST
-                        elif event.key == pygame.K_2:
-                            # Increase bullet speed across mounts
-                            for m in player.gun_mounts:
-                                m.profile.speed += 1.0
-                            player.exp -= UPGRADE_COST
-                        elif event.key == pygame.K_3:
-                            # Increase damage across mounts
-                            for m in player.gun_mounts:
-                                m.profile.damage += 2.0
-                            player.exp -= UPGRADE_COST
-                        elif event.key == pygame.K_4:
-                            player.max_health += 20
-                            player.health = min(player.max_health, player.health + 20)
-                            player.exp -= UPGRADE_COST
-                        elif event.key == pygame.K_5:
-                            # New: Fire rate upgrade
-                            player.fire_rate += 0.5
-                            player.exp -= UPGRADE_COST
-
-        if not game_over:
-            # Skip gameplay logic if specialization menu is open
-            if not show_specialization_menu:
-                player.move(keys, walls)
-                player.regenerate()
-                player.tick_fire_cooldown()
-                player.update_drone_spawners()
-
-                # Aim angle from mouse
-                aim_angle = math.atan2((mouse_y + cam_y) - player.y, (mouse_x + cam_x) - player.x)
-
-                # Continuous fire: hold left mouse
-                mouse_buttons = pygame.mouse.get_pressed()
-                if mouse_buttons[0] and player.can_fire():
-                    new_bullets = player.fire(aim_angle, "player", player.id)
-                    bullets.extend(new_bullets)
-                    player.trigger_fire()
-
-                # Draw player (with barrels and spawners)
-                player.draw(WIN, cam_x, cam_y, aim_angle)
-                # Update player's drones
-                player.update_drones(bots, WIN, cam_x, cam_y, walls)
-
-                # Spawn bots
-                frame_count += 1
-                # do not spawn regular bots while boss is active
-                if frame_count % BOT_SPAWN_RATE == 0 and len(bots) < MAX_BOTS and not boss_manager.active:
-                     bot = spawn_bot(difficulty_level, bot_id_counter, walls)
-                     bot_id_counter += 1
-                     bots.append(bot)
-
-                # Bot AI: orbiting movement with randomness and spacing, aim and fire based on fire_rate
-                for bot in bots:
-                    ang_to_player = update_bot_ai(bot, bots, player, walls=walls)
-                    # fire control
-                    bot.fire_cooldown -= 1
-                    if bot.fire_cooldown <= 0:
-                        # Only fire if there's line of sight to the player
-                        if line_of_sight(bot.x, bot.y, player.x, player.y, walls):
-                            # One bullet from the bot's single mount
-                            prof = bot.gun_mounts[0].profile
-                            bullets.append(Bullet(bot.x, bot.y, ang_to_player, prof.speed, prof.damage, prof.radius, prof.color, "bot", bot.id))
-
-                        # reset cooldown based on bot fire rate regardless (prevents instant fire when LOS appears)
-                        frames_per_shot = max(1, int(FPS / bot.fire_rate))
-                        bot.fire_cooldown = frames_per_shot
-
-                    # draw bot
-                    bot.draw(WIN, cam_x, cam_y, ang_to_player)
-
-                # Bullets update and collision
-                bullets_to_remove = []
-                for bullet in bullets:
-                    bullet.move()
-                    render_bullet(WIN, bullet, cam_x, cam_y)
-
-                    # Bullet-wall collisions: bullets are removed on impact with any wall
-                    hit_wall = False
-                    for w in walls:
-                        if w.collides_circle(bullet.x, bullet.y, bullet.radius):
-                            bullets_to_remove.append(bullet)
-                            hit_wall = True
-                            break
-                    if hit_wall:
-                        continue
-
-                    if bullet.owner == "player":
-                        for bot in bots[:]:
-                            if math.hypot(bullet.x - bot.x, bullet.y - bot.y) < bot.radius:
-                                bot.health -= bullet.damage
-                                bullets_to_remove.append(bullet)
-                                if bot.health <= 0:
-                                    bots.remove(bot)
-                                    player.exp += 5
-                                    player.bot_kills += 1
-                                    
-                                    # Update boss unlock status
-                                    boss_manager.check_unlock(player.bot_kills)
-                                    
-                                    # Check if we should show a specialization menu based purely on kills
-                                    # Use a single effective threshold so rapid unlock behaves consistently
-                                    effective_kills_threshold = 1 if rapid_unlock else KILLS_PER_LEVEL
-                                    kills_since_last_spec = player.bot_kills - kills_at_last_specialization
-
-                                    should_show_menu = (kills_since_last_spec >= effective_kills_threshold)
-
-                                    if should_show_menu and not show_specialization_menu and not player.specialization_complete:
-                                        show_specialization_menu = True
-                                        # If the player already picked a root previously, show the options
-                                        if player.spec_key:
-                                            specialization_stage = 'option'
-                                            pending_root = player.spec_key
-                                            current_tree = specialization_tree(pending_root, player.color)
-                                            current_options = current_tree['options']
-                                        else:
-                                            specialization_stage = 'root'
-                                            pending_root = None
-                                        kills_at_last_specialization = player.bot_kills
-                                    
-                                    # Level up for progression display (independent of specialization menus)
-                                    effective_kills_per_level = 1 if rapid_unlock else KILLS_PER_LEVEL
-                                    if player.bot_kills % effective_kills_per_level == 0:
-                                        player.level += 1
-                                        difficulty_level += 1
-                                break
-
-                    elif bullet.owner == "bot":
-                        # Bot bullets do not hit bots (friendly fire disabled)
-                        # Self-hit disabled by owner_id check implicitly by skipping all bot collisions
-                        # Check player collision only
-                        if math.hypot(bullet.x - player.x, bullet.y - player.y) < player.radius:
-                            player.health -= bullet.damage
-                            bullets_to_remove.append(bullet)
-
-                    elif bullet.owner == "drone":
-                        # Drone bullets (not used here, drones do direct contact damage)
-                        pass
-
-                # Remove bullets safely
-                for b in bullets_to_remove:
-                    if b in bullets:
-                        bullets.remove(b)
-
-                # Update boss manager (handles boss movement, firing, collisions)
-                boss_manager.update(WIN, cam_x, cam_y, font)
-
-                # Game over check
-                if player.health <= 0:
-                    game_over = True
-            else:
-                # When menu is open, still draw the game in background but don't update it
-                player.draw(WIN, cam_x, cam_y, aim_angle)
-                player.update_drones(bots, WIN, cam_x, cam_y, walls)
-                for bot in bots:
-                    # Don't call update_bot_ai here - just draw them as-is
-                    # Calculate angle for drawing but don't update position
-                    ang_to_player = math.atan2(player.y - bot.y, player.x - bot.x)
-                    bot.draw(WIN, cam_x, cam_y, ang_to_player)
-                for bullet in bullets:
-                    render_bullet(WIN, bullet, cam_x, cam_y)
-
-            # HUD
-            hud1 = font.render(
-                f"EXP: {player.exp} | Kills: {player.bot_kills} | Level: {player.level} | Diff: {difficulty_level}",
-                True, WHITE
-            )
-            hud2 = font.render(
-                "Upgrades: 1-Speed 2-BulletSpd 3-Damage 4-Health 5-FireRate (Cost: 5 EXP each)",
-                True, WHITE
-            )
-            # Debug HUD: show whether rapid unlock is active
-            debug_text = font.render(f"RapidUnlock: {'ON' if rapid_unlock else 'OFF'} (F2)", True, WHITE)
-            WIN.blit(hud1, (10, 10))
-            WIN.blit(hud2, (10, 30))
-            WIN.blit(debug_text, (10, 50))
-            
-            # Top-right boss UI text (appears when boss unlocked and not active)
-            if boss_manager.unlocked and not boss_manager.active:
-                t1 = font.render("BOSS FIGHT AVAILABLE", True, WHITE)
-                t2 = font.render("CLICK 0 TO START", True, WHITE)
-                margin = 10
-                # bottom-left: stack t1 above t2 with a small margin from bottom edge
-                t2_y = HEIGHT - margin - t2.get_height()
-                t1_y = t2_y - 4 - t1.get_height()
-                WIN.blit(t1, (margin, t1_y))
-                WIN.blit(t2, (margin, t2_y))
-
-            if show_specialization_menu:
-                # Render either the root selection (1..4) or the chosen root's options (1..2)
-                root_order = ["dual_barrel", "twin_gun", "heavy_cannon", "sniper_barrel"]
-                # Color map for each branch
-                branch_colors = {
-                    "dual_barrel": (255, 200, 100),      # Orange
-                    "twin_gun": (100, 200, 255),         # Light blue
-                    "heavy_cannon": (255, 100, 100),     # Red
-                    "sniper_barrel": (150, 255, 150),    # Light green
-                }
-                
-                if specialization_stage == 'root' or specialization_stage is None:
-                    # Root selection menu
-                    title_text = font.render("Select Specialization Branch:", True, WHITE)
-                    roots_text = "1: Dual Barrel   2: Twin Gun   3: Heavy Cannon   4: Sniper Barrel"
-                    root_text = font.render(roots_text, True, WHITE)
-                    
-                    # Calculate positioning for centered menu
-                    title_rect = title_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 60))
-                    root_rect = root_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 20))
-                    
-                    # Draw semi-transparent background
-                    bg_surf = pygame.Surface((root_rect.width + 40, root_rect.height + 100), pygame.SRCALPHA)
-                    bg_surf.fill((0, 0, 0, 180))
-                    WIN.blit(bg_surf, (WIDTH // 2 - (root_rect.width + 40) // 2, HEIGHT // 2 - 80))
-                    
-                    WIN.blit(title_text, title_rect)
-                    WIN.blit(root_text, root_rect)
-                    
-                elif specialization_stage == 'option' and current_tree is not None:
-                    # Option selection menu
-                    branch_key = pending_root
-                    branch_color = branch_colors.get(branch_key, WHITE)
-                    
-                    title_text = font.render(f"{current_tree['label']} Specialization", True, branch_color)
-                    opt1_text = f"1: {current_tree['options'][0]['label']}"
-                    opt2_text = f"2: {current_tree['options'][1]['label']}"
-                    opt1_render = font.render(opt1_text, True, WHITE)
-                    opt2_render = font.render(opt2_text, True, WHITE)
-                    
-                    # Calculate positioning for centered menu
-                    title_rect = title_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 60))
-                    opt1_rect = opt1_render.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 10))
-                    opt2_rect = opt2_render.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 20))
-                    
-                    # Draw semi-transparent background with branch color tint
-                    max_width = max(opt1_rect.width, opt2_rect.width, title_rect.width) + 40
-                    bg_surf = pygame.Surface((max_width, 130), pygame.SRCALPHA)
-                    bg_color = (*branch_color, 180)  # Add alpha channel
-                    bg_surf.fill(bg_color)
-                    WIN.blit(bg_surf, (WIDTH // 2 - max_width // 2, HEIGHT // 2 - 80))
-                    
-                    WIN.blit(title_text, title_rect)
-                    WIN.blit(opt1_render, opt1_rect)
-                    WIN.blit(opt2_render, opt2_rect)
+        accumulator += clock.tick(render_fps) / 1000.0
+        if frame_start is None:
+            frame_start = time.perf_counter()
+        with profiler.stage("input"):
+            inp = read_input(world)
+        inp.keys[:0] = pending.keys
+        inp.clicks[:0] = pending.clicks
+        pending = inp.held()
+
+        ticks = 0
+        while accumulator >= tick_seconds and ticks < MAX_TICKS_PER_FRAME:
+            # one-shot presses and clicks apply on the first tick only
+            tick_inp = inp if ticks == 0 else inp.held()
+            world.step(tick_inp)
+            if recorder is not None:
+                recorder.record(world, tick_inp)
+            accumulator -= tick_seconds
+            ticks += 1
+        if ticks == 0:
+            pending = inp
+
+        if accumulator >= tick_seconds:
+            # still behind: skip drawing for a few frames, then drop the backlog
+            if skipped < MAX_SKIPPED_FRAMES:
+                skipped += 1
+                continue
+            accumulator %= tick_seconds
+        skipped = 0
+
+        with world.interpolated(accumulator / tick_seconds):
+            draw_world(WIN, world, font)
+        if profiler.overlay:
+            draw_profiler_overlay(WIN, world, font)
+        with profiler.stage("present"):
+            pygame.display.update()
+        profiler.end_frame()
+
+        # Collect the old generations while nobody can notice: when gameplay is paused,
+        # or in the time left of this frame's budget
+        frame_ms = (time.perf_counter() - frame_start) * 1000.0
+        if world.show_specialization_menu or world.game_over:
+            gc_manager.slot()
         else:
-            over_text = font.render("GAME OVER - Press R to Restart", True, RED)
-            WIN.blit(over_text, (WIDTH//2 - 120, HEIGHT//2))
+            gc_manager.idle(1000.0 / render_fps - frame_ms)
+        pauses = gc_manager.take_pauses()
+
+        frame += 1
+        if writer is not None:
+            writer.write({
+                "frame": frame,
+                "tick": world.tick,
+                "frame_ms": frame_ms,
+                "stages": profiler.last,
+                "counts": entity_counts(world),
+                "gc": gc_counter.delta(),
+                "gc_ms": sum(ms for _, ms in pauses),
+            })
+        frame_start = None
 
-        pygame.display.update()
 
 if __name__ == "__main__":
-
-    main()
-
-
+    parser = argparse.ArgumentParser(description="Tank Battle")
+    parser.add_argument("--render-fps", type=int, default=FPS,
+                        help="frames drawn per second; the simulation always ticks at %d Hz" % FPS)
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed for the world's random streams (default: random)")
+    parser.add_argument("--record", metavar="PATH", default=None,
+                        help="write every tick's input to PATH (also in turbo mode)")
+    parser.add_argument("--replay", metavar="PATH", default=None,
+                        help="replay a recording headless with its seed and report tick times")
+    parser.add_argument("--telemetry", metavar="PATH", default=None,
+                        help="write per-frame timings to PATH (.csv, or JSON lines otherwise)")
+    parser.add_argument("--turbo", action="store_true",
+                        help="run headless on autopilot as fast as possible and report ticks per second")
+    parser.add_argument("--ticks", type=int, default=None,
+                        help="turbo: stop after this many ticks (default with --kills/--until-boss: %d)" % TURBO_MAX_TICKS)
+    parser.add_argument("--kills", type=int, default=None, help="turbo: stop at this many kills")
+    parser.add_argument("--until-boss", action="store_true", help="turbo: stop when a boss is defeated")
+    args = parser.parse_args()
+    if args.replay:
+        stats = replay(args.replay, telemetry=args.telemetry)
+        print(format_replay_report(stats))
+        if stats["telemetry"] is not None:
+            print(format_summary(stats["telemetry"]))
+    elif args.turbo:
+        print(format_report(run_turbo(max_ticks=args.ticks, max_kills=args.kills, until_boss=args.until_boss,
+                                       seed=args.seed, record=args.record)))
+    else:
+        main(render_fps=args.render_fps, seed=args.seed, record=args.record, telemetry=args.telemetry)
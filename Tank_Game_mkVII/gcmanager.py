@@ -0,0 +1,137 @@
+"""Garbage-collector pause control for the frame loop.
+
+Every frame allocates plenty of short-lived objects, and Python's automatic collection of
+the older generations then lands on whatever frame happens to cross the threshold. While
+a `GCManager` is installed:
+
+- young-generation collections stay automatic (they are short), but the thresholds of
+  the older generations are raised so they practically never trigger on their own;
+- after every world reset the objects that live for the whole session (wall layout,
+  caches, modules) are moved to the permanent generation with `gc.freeze()`, so later
+  full collections do not traverse them; this takes a full collection, so it waits for
+  the next slot instead of pausing the frame that reset the world;
+- full collections run in controlled slots instead: frames where gameplay is paused
+  (specialization menu, game over) and frames that finished early enough for the
+  expected pause to fit in the remaining budget;
+- every pause is timed through `gc.callbacks`, for the profiler overlay and telemetry.
+"""
+
+from __future__ import annotations
+
+import gc
+import time
+
+# Young-generation threshold (Python's default) and the raised old-generation ones
+GC_GEN0_THRESHOLD = 700
+GC_OLD_THRESHOLD = 1000
+# Pending collections (Python's default old-generation thresholds) before an idle frame
+# runs one, so collections happen about as often as usual, just at better moments
+GC_IDLE_THRESHOLD = 10
+# Expected pause per generation (ms) until one has been measured
+GC_DEFAULT_COST_MS = (0.1, 0.5, 5.0)
+
+
+class GCManager:
+    """Schedules old-generation collections and records every collector pause."""
+
+    def __init__(self):
+        self.installed = False
+        self.pauses = []  # (generation, ms) since the last take_pauses()
+        self.last_pauses = []
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.cost_ms = list(GC_DEFAULT_COST_MS)  # last measured pause per generation
+        self.freeze_ms = GC_DEFAULT_COST_MS[2]  # last measured unfreeze-collect-freeze
+        self._pending_freeze = False
+        self._saved_threshold = None
+        self._start = 0.0
+
+    def install(self):
+        if self.installed:
+            return
+        self._saved_threshold = gc.get_threshold()
+        gc.set_threshold(GC_GEN0_THRESHOLD, GC_OLD_THRESHOLD, GC_OLD_THRESHOLD)
+        gc.callbacks.append(self._on_gc)
+        self.installed = True
+
+    def uninstall(self):
+        if not self.installed:
+            return
+        gc.callbacks.remove(self._on_gc)
+        gc.set_threshold(*self._saved_threshold)
+        gc.unfreeze()
+        self._pending_freeze = False
+        self.installed = False
+
+    def _on_gc(self, phase, info):
+        if phase == "start":
+            self._start = time.perf_counter()
+            return
+        ms = (time.perf_counter() - self._start) * 1000.0
+        generation = info["generation"]
+        self.pauses.append((generation, ms))
+        self.cost_ms[generation] = ms
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def after_reset(self):
+        """Have the next `slot` or fitting `idle` freeze the freshly reset world.
+
+        No-op unless installed.
+        """
+        if self.installed:
+            self._pending_freeze = True
+
+    def _refreeze(self):
+        start = time.perf_counter()
+        # release the previous session's frozen objects so they can be collected
+        gc.unfreeze()
+        gc.collect()
+        gc.freeze()
+        self.freeze_ms = (time.perf_counter() - start) * 1000.0
+        self._pending_freeze = False
+
+    def slot(self):
+        """Collect everything pending; call on frames where a pause cannot be noticed."""
+        if not self.installed:
+            return
+        if self._pending_freeze:
+            self._refreeze()
+            return
+        _, young, old = gc.get_count()
+        if old:
+            gc.collect(2)
+        elif young:
+            gc.collect(1)
+
+    def idle(self, spare_ms):
+        """Run the oldest pending collection whose last measured pause fits in `spare_ms`."""
+        if not self.installed:
+            return
+        if self._pending_freeze and self.freeze_ms <= spare_ms:
+            self._refreeze()
+            return
+        _, young, old = gc.get_count()
+        if old >= GC_IDLE_THRESHOLD and self.cost_ms[2] <= spare_ms:
+            gc.collect(2)
+        elif young >= GC_IDLE_THRESHOLD and self.cost_ms[1] <= spare_ms:
+            gc.collect(1)
+
+    def take_pauses(self):
+        """Return the pauses since the last call as [(generation, ms)] and start a new list."""
+        self.last_pauses, self.pauses = self.pauses, []
+        return self.last_pauses
+
+    def summary(self):
+        return {"pauses": self.count, "total_ms": self.total_ms, "max_ms": self.max_ms}
+
+
+def format_summary(summary):
+    return "gc: {pauses} pauses, {total_ms:.1f} ms in total, longest {max_ms:.2f} ms".format(**summary)
+
+
+# The game's collector manager; World.reset schedules a freeze through it once installed
+gc_manager = GCManager()
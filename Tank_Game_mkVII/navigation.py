@@ -0,0 +1,170 @@
+"""Shared flow-field pathfinding toward the player.
+
+A `FlowField` computes the path cost from the player's grid cell to every cell of the
+same blocked-cell grid used by `walls._cell_grid_reachable`, then stores for every cell
+which neighbouring cell is closest to the player. Any number of bots can read
+their steering direction from it in O(1), and the field is only recomputed when the
+player changes cell or the wall layout changes.
+
+The costs are found with whole-grid sweeps instead of a cell-by-cell search: one sweep
+relaxes every row (or column) in one direction at once with a running minimum, and
+sweeps in all four directions repeat until nothing changes. That takes one round per
+turn in the longest path, a handful for these layouts, and gives the same costs as
+a Dijkstra search.
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from config import WORLD_WIDTH, WORLD_HEIGHT
+from walls import _blocked_cells, wall_bounds_array
+
+FLOW_CELL_SIZE = 32
+# Cells whose centre is closer than this to a wall (a tank would touch it there) are
+# passable but cost more, so paths run through the middle of gaps and keep bots off
+# wall faces and corners without closing narrow gaps
+FLOW_CLEARANCE = 22
+FLOW_NEAR_WALL_COST = 8
+# Cost of entering a cell covered by a wall: larger than any real path, so no result
+# below it ever goes through a wall
+FLOW_BLOCKED_COST = 1e9
+
+# 8-neighbourhood offsets (di, dj)
+_NEIGHBOURS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
+class FlowField:
+    """Per-cell steering directions toward a target (the player)."""
+
+    def __init__(self, cell_size=FLOW_CELL_SIZE, clearance=FLOW_CLEARANCE):
+        self.cell_size = cell_size
+        self.clearance = clearance
+        self.cols = (WORLD_WIDTH + cell_size - 1) // cell_size
+        self.rows = (WORLD_HEIGHT + cell_size - 1) // cell_size
+        self.target = None
+        self.target_cell = None
+        self._layout_key = None
+        self._sweeps = None
+        self._waypoint_x = None
+        self._waypoint_y = None
+        self.dist = None
+        self.next_di = None
+        self.next_dj = None
+
+    def cell_of(self, x, y):
+        i = min(self.cols - 1, max(0, int(x // self.cell_size)))
+        j = min(self.rows - 1, max(0, int(y // self.cell_size)))
+        return i, j
+
+    def update(self, walls, target_x, target_y):
+        """Point the field at (target_x, target_y). Returns True if it was recomputed."""
+        self.target = (target_x, target_y)
+        layout_key = (id(walls), getattr(walls, "version", None), len(walls) if walls else 0)
+        cell = self.cell_of(target_x, target_y)
+        if layout_key == self._layout_key and cell == self.target_cell:
+            return False
+        if layout_key != self._layout_key:
+            blocked = np.zeros((self.rows, self.cols), dtype=bool)
+            for i, j in _blocked_cells(walls, self.cell_size):
+                blocked[j, i] = True
+            # distance from every cell centre to the nearest wall, and the offset from
+            # the closest point on that wall
+            cs = self.cell_size
+            cx, cy = np.meshgrid((np.arange(self.cols) + 0.5) * cs, (np.arange(self.rows) + 0.5) * cs)
+            gap = np.full((self.rows, self.cols), np.inf)
+            away_x = np.zeros_like(gap)
+            away_y = np.zeros_like(gap)
+            for left, top, right, bottom in wall_bounds_array(walls) if walls else ():
+                dx = cx - np.clip(cx, left, right)
+                dy = cy - np.clip(cy, top, bottom)
+                d = np.hypot(dx, dy)
+                closer = d < gap
+                gap = np.where(closer, d, gap)
+                away_x = np.where(closer, dx, away_x)
+                away_y = np.where(closer, dy, away_y)
+            tight = (gap < self.clearance) & (gap > 0)
+            cost = np.where(gap < self.clearance, FLOW_NEAR_WALL_COST, 1.0)
+            cost[blocked] = FLOW_BLOCKED_COST
+            # Bots steer toward these waypoints: the cell centre, pushed out to `clearance`
+            # from the nearest wall (staying inside the cell) where the centre is too tight.
+            push = np.where(tight, (self.clearance - gap) / np.where(tight, gap, 1.0), 0.0)
+            half = cs / 2
+            self._waypoint_x = (cx + np.clip(away_x * push, -half, half)).tolist()
+            self._waypoint_y = (cy + np.clip(away_y * push, -half, half)).tolist()
+            # (axis, reversed, running cost along the sweep) for the four sweep directions
+            self._sweeps = [(axis, flip, np.cumsum(np.flip(cost, axis) if flip else cost, axis=axis))
+                            for axis in (1, 0) for flip in (False, True)]
+            self._layout_key = layout_key
+        self.target_cell = cell
+        self._compute()
+        return True
+
+    def _compute(self):
+        rows, cols = self.rows, self.cols
+        ti, tj = self.target_cell
+        # Path cost over cells not covered by a wall (the target cell itself is always
+        # allowed). A sweep along a row in +x sets dist[i] = min over k <= i of
+        # dist[k] + cost[k+1..i], which is cum[i] + min(dist[k] - cum[k]) with the running
+        # cost cum. Costs are whole numbers, so the sums are exact.
+        dist = np.full((rows, cols), np.inf)
+        dist[tj, ti] = 0.0
+        while True:
+            before = dist
+            for axis, flip, cum in self._sweeps:
+                d = np.flip(dist, axis) if flip else dist
+                d = cum + np.minimum.accumulate(d - cum, axis=axis)
+                dist = np.flip(d, axis) if flip else d
+            if np.array_equal(dist, before):
+                break
+        dist[dist >= FLOW_BLOCKED_COST] = np.inf
+
+        # For every cell pick the neighbour with the smallest distance. Diagonal moves are
+        # only allowed when both orthogonal neighbours are free, so paths don't cut corners.
+        padded = np.full((rows + 2, cols + 2), np.inf)
+        padded[1:-1, 1:-1] = dist
+        free = np.zeros((rows + 2, cols + 2), dtype=bool)
+        free[1:-1, 1:-1] = np.isfinite(dist)
+        best = dist.copy()
+        best_di = np.zeros((rows, cols))
+        best_dj = np.zeros((rows, cols))
+        for di, dj in _NEIGHBOURS:
+            nd = padded[1 + dj:rows + 1 + dj, 1 + di:cols + 1 + di]
+            if di and dj:
+                ok = free[1:-1, 1 + di:cols + 1 + di] & free[1 + dj:rows + 1 + dj, 1:-1]
+                nd = np.where(ok, nd, np.inf)
+            better = nd < best
+            best = np.where(better, nd, best)
+            best_di = np.where(better, di, best_di)
+            best_dj = np.where(better, dj, best_dj)
+        self.dist = dist
+        self.next_di = best_di.astype(int).tolist()
+        self.next_dj = best_dj.astype(int).tolist()
+
+    def direction(self, x, y):
+        """Return the unit steering direction at (x, y), or None if there is no path."""
+        if self.dist is None:
+            return None
+        i, j = self.cell_of(x, y)
+        if (i, j) == self.target_cell:
+            dx = self.target[0] - x
+            dy = self.target[1] - y
+            d = math.hypot(dx, dy)
+            if d == 0:
+                return None
+            return dx / d, dy / d
+        # Steer toward the waypoint of the best neighbouring cell (cells covered by a wall
+        # still point at their best free neighbour). Aiming at waypoints rather than moving
+        # along the grid axis keeps bots from snagging on wall corners.
+        di = self.next_di[j][i]
+        dj = self.next_dj[j][i]
+        if di == 0 and dj == 0:
+            return None
+        dx = self._waypoint_x[j + dj][i + di] - x
+        dy = self._waypoint_y[j + dj][i + di] - y
+        d = math.hypot(dx, dy)
+        if d == 0:
+            return None
+        return dx / d, dy / d
@@ -0,0 +1,176 @@
+"""Per-stage frame profiler with an on-screen overlay (toggled with F3).
+
+Code marks each stage of a frame with `with profiler.stage("ai"): ...`. The timers run
+while the overlay is shown or while something else (telemetry) asks for them with
+`collect`; while the profiler is disabled `stage()` hands back one shared no-op
+context manager, so the markers cost a method call and nothing else. While enabled,
+every stage adds its wall-clock time to the current frame; `end_frame()` closes the
+frame and keeps a short history that the overlay averages over.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from contextlib import nullcontext
+
+import pygame
+
+from config import FPS, WHITE
+
+# Frames averaged by the overlay
+PROFILER_HISTORY = 30
+# Overlay bar width in pixels and the frame time it spans
+OVERLAY_BAR_WIDTH = 300
+OVERLAY_BAR_MS = 2 * 1000.0 / FPS
+# Top of the overlay panel (below the HUD text) and entity counts shown per line
+OVERLAY_TOP = 80
+OVERLAY_COUNTS_PER_LINE = 3
+
+# Stages in the order they run in a frame, with their bar colours. Stages not listed
+# here are still timed and drawn in grey after these.
+STAGES = (
+    ("input", (150, 150, 150)),
+    ("player", (255, 255, 255)),
+    ("drones", (0, 200, 200)),
+    ("spawn", (120, 120, 255)),
+    ("ai", (0, 220, 0)),
+    ("bullets", (245, 235, 66)),
+    ("boss", (220, 30, 220)),
+    ("border", (90, 90, 90)),
+    ("walls", (200, 120, 60)),
+    ("tanks", (60, 160, 255)),
+    ("projectiles", (255, 165, 0)),
+    ("boss_draw", (160, 20, 160)),
+    ("hud", (180, 180, 180)),
+    ("present", (255, 80, 80)),
+)
+_STAGE_COLORS = dict(STAGES)
+_OTHER_COLOR = (120, 120, 120)
+
+_NULL_STAGE = nullcontext()
+
+
+class _Stage:
+    """Timing context for one named stage; reused every frame."""
+
+    __slots__ = ("totals", "name", "start")
+
+    def __init__(self, totals, name):
+        self.totals = totals
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        totals = self.totals
+        totals[self.name] = totals.get(self.name, 0.0) + (time.perf_counter() - self.start)
+        return False
+
+
+class FrameProfiler:
+    """Scoped per-stage timers for the frame loop."""
+
+    def __init__(self, history=PROFILER_HISTORY):
+        self.enabled = False  # timers running: overlay or collect
+        self.overlay = False
+        self.collect = False
+        self.current = {}  # stage -> seconds, for the frame in progress
+        self.last = {}     # stage -> milliseconds, for the last finished frame
+        self.history = deque(maxlen=history)
+        self._stages = {}
+
+    def toggle(self):
+        """Show or hide the overlay."""
+        self.overlay = not self.overlay
+        self.history.clear()
+        self._update()
+
+    def set_collect(self, collect):
+        """Keep the timers running without the overlay (for telemetry)."""
+        self.collect = collect
+        self._update()
+
+    def _update(self):
+        enabled = self.overlay or self.collect
+        if enabled != self.enabled:
+            self.enabled = enabled
+            self.current.clear()
+            self.last = {}
+
+    def stage(self, name):
+        """Context manager timing one stage of the current frame."""
+        if not self.enabled:
+            return _NULL_STAGE
+        scope = self._stages.get(name)
+        if scope is None:
+            scope = self._stages[name] = _Stage(self.current, name)
+        return scope
+
+    def end_frame(self):
+        """Close the current frame: its stage times move into `last` and the history."""
+        if not self.enabled:
+            return
+        self.last = {name: seconds * 1000.0 for name, seconds in self.current.items()}
+        self.history.append(self.last)
+        self.current.clear()
+
+    def averages(self):
+        """Mean milliseconds per stage over the history, in frame order."""
+        if not self.history:
+            return []
+        totals = {}
+        for frame in self.history:
+            for name, ms in frame.items():
+                totals[name] = totals.get(name, 0.0) + ms
+        order = [name for name, _ in STAGES if name in totals]
+        order += sorted(name for name in totals if name not in _STAGE_COLORS)
+        n = len(self.history)
+        return [(name, totals[name] / n) for name in order]
+
+    def draw(self, win, font, counts=()):
+        """Draw the stacked stage bar, per-stage legend and `counts` ((label, value) pairs)."""
+        stages = self.averages()
+        total = sum(ms for _, ms in stages)
+        counts = list(counts)
+        count_lines = ["  ".join(f"{label} {value}" for label, value in counts[i:i + OVERLAY_COUNTS_PER_LINE])
+                       for i in range(0, len(counts), OVERLAY_COUNTS_PER_LINE)]
+        x = win.get_width() - OVERLAY_BAR_WIDTH - 10
+        y = OVERLAY_TOP
+        line_h = font.get_linesize()
+        rows = 1 + len(stages) + len(count_lines)
+        panel = pygame.Surface((OVERLAY_BAR_WIDTH + 10, 28 + rows * line_h), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        win.blit(panel, (x - 5, y - 5))
+
+        # stacked bar, with a tick at one frame's budget (half the bar)
+        scale = OVERLAY_BAR_WIDTH / OVERLAY_BAR_MS
+        bx = float(x)
+        for name, ms in stages:
+            w = ms * scale
+            if bx + w > x + OVERLAY_BAR_WIDTH:
+                w = x + OVERLAY_BAR_WIDTH - bx
+            if w >= 1:
+                pygame.draw.rect(win, _STAGE_COLORS.get(name, _OTHER_COLOR), (int(bx), y, int(w), 12))
+            bx += max(w, 0)
+        budget_x = x + OVERLAY_BAR_WIDTH // 2
+        pygame.draw.line(win, WHITE, (budget_x, y - 2), (budget_x, y + 14))
+        y += 18
+
+        win.blit(font.render(f"frame {total:.2f} ms (budget {1000.0 / FPS:.1f} ms)", True, WHITE), (x, y))
+        y += line_h
+        for name, ms in stages:
+            pygame.draw.rect(win, _STAGE_COLORS.get(name, _OTHER_COLOR), (x, y + 3, 10, 10))
+            win.blit(font.render(name, True, WHITE), (x + 16, y))
+            win.blit(font.render(f"{ms:.2f} ms", True, WHITE), (x + 130, y))
+            y += line_h
+        for text in count_lines:
+            win.blit(font.render(text, True, WHITE), (x, y))
+            y += line_h
+
+
+# The game's profiler; stages in world.py and game.py report here
+profiler = FrameProfiler()
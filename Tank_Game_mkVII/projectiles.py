@@ -0,0 +1,275 @@
+"""Struct-of-arrays projectile storage for Tank Game.
+
+Instead of one `core.Bullet` object per shot, a `ProjectileStore` keeps every live
+projectile in parallel NumPy arrays (position, velocity, damage, radius, owner team,
+owner id, colour, remaining lifetime, alive flag). Moving, culling and collision tests
+then run as array operations over all bullets at once instead of a Python loop per bullet.
+
+The store also owns the projectile lifecycle: projectiles expire when they leave the
+world or, if given one, when their time-to-live runs out (`expire`), dead records are
+removed by swap-and-pop (`compact`), and the preallocated arrays beyond `count` act as
+the pool new projectiles are written into.
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pygame
+
+import walls as walls_mod
+from config import WORLD_WIDTH, WORLD_HEIGHT, BULLET_WORLD_MARGIN
+
+# Owner labels used throughout the game, mapped to compact team codes
+TEAM_PLAYER = 0
+TEAM_BOT = 1
+TEAM_DRONE = 2
+TEAM_BOSS = 3
+TEAMS = {"player": TEAM_PLAYER, "bot": TEAM_BOT, "drone": TEAM_DRONE, "boss": TEAM_BOSS}
+
+# owner_id value stored for projectiles without an owner (None)
+NO_OWNER = -(2 ** 31)
+
+
+class ProjectileStore:
+    """Parallel-array storage for projectiles.
+
+    Slots `[0, count)` hold the projectiles; dead ones are flagged in `alive` and removed
+    in bulk by `compact()`, which fills their slots with records from the end. Slot order
+    is therefore not spawn order: `serial` numbers projectiles in spawn order, and the
+    collision queries report hits in that order.
+
+    `lifetime` is the default time-to-live in frames (None: projectiles live until they
+    hit something or leave the world, as bullets always have), and `bounds` the
+    (left, top, right, bottom) rectangle outside which projectiles expire.
+    """
+
+    def __init__(self, capacity: int = 256, lifetime: int | None = None, bounds=None):
+        self.count = 0
+        self.lifetime = lifetime
+        if bounds is None:
+            m = BULLET_WORLD_MARGIN
+            bounds = (-m, -m, WORLD_WIDTH + m, WORLD_HEIGHT + m)
+        self.bounds = bounds
+        self._next_serial = 0
+        self._allocate(max(1, int(capacity)))
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.damage = np.zeros(capacity)
+        self.radius = np.zeros(capacity)
+        self.team = np.zeros(capacity, dtype=np.int8)
+        self.owner_id = np.zeros(capacity, dtype=np.int64)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+        self.ttl = np.zeros(capacity, dtype=np.int32)  # frames left; 0 means no limit
+        self.serial = np.zeros(capacity, dtype=np.int64)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+    def _fields(self):
+        return ("x", "y", "vx", "vy", "damage", "radius", "team", "owner_id", "color", "ttl", "serial", "alive")
+
+    def _grow(self):
+        old = {name: getattr(self, name) for name in self._fields()}
+        n = self.count
+        self._allocate(self.capacity * 2)
+        for name, arr in old.items():
+            getattr(self, name)[:n] = arr[:n]
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive[:self.count]))
+
+    def __bool__(self):
+        return len(self) > 0
+
+    # ------------------------------------------------------------------
+    # Spawning
+    # ------------------------------------------------------------------
+    def spawn(self, x, y, angle, speed, damage, radius, color, owner, owner_id=None, ttl=None):
+        """Append one projectile and return its slot index.
+
+        `ttl` overrides the store's default lifetime (in frames, at least 1) for this
+        projectile.
+        """
+        if self.count == self.capacity:
+            self._grow()
+        i = self.count
+        self.x[i] = x
+        self.y[i] = y
+        self.vx[i] = math.cos(angle) * speed
+        self.vy[i] = math.sin(angle) * speed
+        self.damage[i] = damage
+        self.radius[i] = radius
+        self.team[i] = TEAMS[owner]
+        self.owner_id[i] = NO_OWNER if owner_id is None else owner_id
+        self.color[i] = color[:3]
+        if ttl is None:
+            ttl = self.lifetime
+        self.ttl[i] = 0 if ttl is None else max(1, ttl)
+        self.serial[i] = self._next_serial
+        self._next_serial += 1
+        self.alive[i] = True
+        self.count += 1
+        return i
+
+    def add(self, bullet):
+        """Append a `core.Bullet` (or any object with the same attributes)."""
+        return self.spawn(bullet.x, bullet.y, bullet.angle, bullet.speed, bullet.damage,
+                          bullet.radius, bullet.color, bullet.owner, bullet.owner_id)
+
+    # ------------------------------------------------------------------
+    # Bulk operations
+    # ------------------------------------------------------------------
+    def live_indices(self, team=None):
+        """Return indices of live projectiles, optionally only those of `team` (a label)."""
+        n = self.count
+        mask = self.alive[:n]
+        if team is not None:
+            mask = mask & (self.team[:n] == TEAMS[team])
+        return np.flatnonzero(mask)
+
+    def move(self):
+        n = self.count
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+
+    def kill(self, which):
+        """Flag projectiles dead; `which` is an index array or a boolean mask over `[0, count)`."""
+        which = np.asarray(which)
+        if which.dtype == bool:
+            self.alive[:self.count] &= ~which
+        else:
+            self.alive[which] = False
+
+    def cull_outside(self, left, top, right, bottom):
+        """Kill every projectile whose centre lies outside the given rectangle."""
+        n = self.count
+        x = self.x[:n]
+        y = self.y[:n]
+        self.kill((x < left) | (x > right) | (y < top) | (y > bottom))
+
+    def expire(self):
+        """Age projectiles with a lifetime by one frame; kill those out of time or outside `bounds`."""
+        n = self.count
+        ttl = self.ttl[:n]
+        limited = ttl > 0
+        if limited.any():
+            ttl[limited] -= 1
+            self.kill(limited & (ttl == 0))
+        self.cull_outside(*self.bounds)
+
+    def compact(self):
+        """Drop dead projectiles by swap-and-pop.
+
+        Dead slots below the new count are filled with the live records above it, so only
+        as many records move as there are holes. Slots past `count` stay allocated and
+        are reused by later spawns.
+        """
+        n = self.count
+        alive = self.alive[:n]
+        m = int(np.count_nonzero(alive))
+        if m == n:
+            return
+        holes = np.flatnonzero(~alive[:m])
+        movers = np.flatnonzero(alive[m:]) + m
+        if len(holes):
+            for name in self._fields():
+                arr = getattr(self, name)
+                arr[holes] = arr[movers]
+        self.alive[m:n] = False
+        self.count = m
+
+    def keep_owner(self, owner):
+        """Kill every projectile not fired by `owner` and compact."""
+        n = self.count
+        self.kill(self.team[:n] != TEAMS[owner])
+        self.compact()
+
+    def clear(self):
+        self.alive[:self.count] = False
+        self.count = 0
+
+    # ------------------------------------------------------------------
+    # Collision queries
+    # ------------------------------------------------------------------
+    def circle_hits(self, cx, cy, radius, team=None):
+        """Return indices (in spawn order) of live projectiles whose centre is within `radius`."""
+        idx = self.live_indices(team)
+        if len(idx) == 0:
+            return idx
+        d = np.hypot(self.x[idx] - cx, self.y[idx] - cy)
+        hits = idx[d < radius]
+        return hits[np.argsort(self.serial[hits], kind="stable")]
+
+    def grid_hits(self, grid, team=None):
+        """Return `(slot, entry)` hits of live projectiles against a `spatial.SpatialHash`.
+
+        Each projectile is only tested against the entities registered in its own cell
+        (entities are registered into every cell their hit circle overlaps). A hit means
+        the projectile centre lies within the entity's registered radius. Pairs are sorted
+        by spawn order (`serial`), then by the entities' insertion order.
+        """
+        idx = self.live_indices(team)
+        if len(idx) == 0 or not grid.cells:
+            return []
+        cs = grid.cell_size
+        ci = np.floor(self.x[idx] / cs).astype(np.int64)
+        cj = np.floor(self.y[idx] / cs).astype(np.int64)
+        keys = (ci << 32) + cj
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        hits = []
+        for (i, j), entries in grid.cells.items():
+            key = (i << 32) + j
+            lo = np.searchsorted(sorted_keys, key, side="left")
+            hi = np.searchsorted(sorted_keys, key, side="right")
+            if lo == hi:
+                continue
+            slots = idx[order[lo:hi]]
+            bx = self.x[slots]
+            by = self.y[slots]
+            for entry in entries:
+                _, _, ex, ey, er = entry
+                inside = np.hypot(bx - ex, by - ey) < er
+                if inside.any():
+                    hits.extend((slot, entry) for slot in slots[inside].tolist())
+        serial = self.serial
+        hits.sort(key=lambda h: (serial[h[0]], h[1][0]))
+        return hits
+
+    def wall_hits(self, walls):
+        """Boolean mask over `[0, count)` of live projectiles that touched a wall this frame.
+
+        Each projectile is swept from its previous position (one velocity step back) to
+        the current one, so fast shots cannot tunnel through thin walls. At the end
+        position this is the same closest-point test as `Wall.collides_circle`. Nothing
+        hits while the layout's collision is off (see `walls.WallList`).
+        """
+        n = self.count
+        if not walls or n == 0:
+            return np.zeros(n, dtype=bool)
+        x = self.x[:n]
+        y = self.y[:n]
+        hit = walls_mod.swept_circles_hit_walls(x - self.vx[:n], y - self.vy[:n], x, y, self.radius[:n], walls)
+        return hit & self.alive[:n]
+
+    # ------------------------------------------------------------------
+    # Rendering
+    # ------------------------------------------------------------------
+    def draw(self, win, cam_x, cam_y, view=None):
+        """Draw live projectiles; with a `culling.ViewCuller`, only those near the view."""
+        idx = self.live_indices()
+        if len(idx) and view is not None:
+            idx = idx[view.visible_mask(self.x[idx], self.y[idx], self.radius[idx])]
+        if len(idx) == 0:
+            return
+        xs = (self.x[idx] - cam_x).astype(int).tolist()
+        ys = (self.y[idx] - cam_y).astype(int).tolist()
+        rs = self.radius[idx].astype(int).tolist()
+        colors = self.color[idx].tolist()
+        for sx, sy, r, col in zip(xs, ys, rs, colors):
+            pygame.draw.circle(win, col, (sx, sy), r)
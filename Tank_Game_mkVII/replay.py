@@ -0,0 +1,198 @@
+"""Recording and replaying per-tick player input.
+
+An `InputRecorder` writes the `FrameInput` of every simulation tick to a compact binary
+stream; `replay` feeds such a stream back into a headless `World` built from the same
+seed. Since every random draw comes from the world's seeded streams, the replayed run
+is identical to the recorded one, so a long session can be re-run in seconds and its
+tick times compared between builds.
+
+Stream layout (little-endian): a header of magic, format version and world seed, then
+one record per tick:
+
+- flags (1 byte): held keys W/S/A/D, fire, aim angle present, events present;
+- aim angle (float64, radians), if present: the angle the world used that tick, so
+  the replay does not depend on the mouse position or camera;
+- events, if present: a count (1 byte), then per event a type byte followed by the
+  key code (uint32) or the click position (two int16).
+"""
+
+from __future__ import annotations
+
+import struct
+import time
+
+from world import World, FrameInput
+from profiler import profiler
+from telemetry import TelemetryWriter, GCCounter, entity_counts
+
+MAGIC = b"TGIR"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sBq")
+_FLAGS = struct.Struct("<B")
+_ANGLE = struct.Struct("<d")
+_COUNT = struct.Struct("<B")
+_KEY = struct.Struct("<I")
+_CLICK = struct.Struct("<hh")
+
+FLAG_UP = 1
+FLAG_DOWN = 2
+FLAG_LEFT = 4
+FLAG_RIGHT = 8
+FLAG_FIRE = 16
+FLAG_AIM = 32
+FLAG_EVENTS = 64
+
+EVENT_KEY = 0
+EVENT_CLICK = 1
+
+# at most this many events fit in one record; more in a single tick are dropped
+MAX_EVENTS_PER_TICK = 255
+
+
+class ReplayError(Exception):
+    """Raised for streams that are not valid input recordings."""
+
+
+class InputRecorder:
+    """Write one record per simulation tick to a binary file.
+
+    Call `record(world, inp)` right after `world.step(inp)`; the aim angle is taken from
+    the world so it is exactly the one the step used.
+    """
+
+    def __init__(self, path, seed):
+        self.path = path
+        self.ticks = 0
+        self._file = open(path, "wb")
+        self._file.write(_HEADER.pack(MAGIC, VERSION, seed))
+
+    def record(self, world, inp):
+        flags = ((FLAG_UP if inp.up else 0) | (FLAG_DOWN if inp.down else 0)
+                 | (FLAG_LEFT if inp.left else 0) | (FLAG_RIGHT if inp.right else 0)
+                 | (FLAG_FIRE if inp.fire else 0))
+        aimed = inp.aim_angle is not None or inp.aim is not None
+        events = [(EVENT_KEY, key) for key in inp.keys] + [(EVENT_CLICK, pos) for pos in inp.clicks]
+        events = events[:MAX_EVENTS_PER_TICK]
+        if aimed:
+            flags |= FLAG_AIM
+        if events:
+            flags |= FLAG_EVENTS
+        parts = [_FLAGS.pack(flags)]
+        if aimed:
+            parts.append(_ANGLE.pack(world.aim_angle))
+        if events:
+            parts.append(_COUNT.pack(len(events)))
+            for kind, value in events:
+                parts.append(_FLAGS.pack(kind))
+                parts.append(_KEY.pack(value) if kind == EVENT_KEY else _CLICK.pack(*value))
+        self._file.write(b"".join(parts))
+        self.ticks += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_recording(path):
+    """Return `(seed, inputs)` for a recording: the world seed and one FrameInput per tick."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < _HEADER.size:
+        raise ReplayError(f"{path}: too short for an input recording")
+    magic, version, seed = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ReplayError(f"{path}: not an input recording")
+    if version != VERSION:
+        raise ReplayError(f"{path}: unsupported recording version {version}")
+    inputs = []
+    pos = _HEADER.size
+    try:
+        while pos < len(data):
+            (flags,) = _FLAGS.unpack_from(data, pos)
+            pos += _FLAGS.size
+            inp = FrameInput(up=bool(flags & FLAG_UP), down=bool(flags & FLAG_DOWN),
+                             left=bool(flags & FLAG_LEFT), right=bool(flags & FLAG_RIGHT),
+                             fire=bool(flags & FLAG_FIRE))
+            if flags & FLAG_AIM:
+                (inp.aim_angle,) = _ANGLE.unpack_from(data, pos)
+                pos += _ANGLE.size
+            if flags & FLAG_EVENTS:
+                (count,) = _COUNT.unpack_from(data, pos)
+                pos += _COUNT.size
+                for _ in range(count):
+                    (kind,) = _FLAGS.unpack_from(data, pos)
+                    pos += _FLAGS.size
+                    if kind == EVENT_KEY:
+                        inp.keys.append(_KEY.unpack_from(data, pos)[0])
+                        pos += _KEY.size
+                    elif kind == EVENT_CLICK:
+                        inp.clicks.append(_CLICK.unpack_from(data, pos))
+                        pos += _CLICK.size
+                    else:
+                        raise ReplayError(f"{path}: unknown event type {kind}")
+            inputs.append(inp)
+    except struct.error:
+        raise ReplayError(f"{path}: truncated after {len(inputs)} ticks") from None
+    return seed, inputs
+
+
+def replay(path, world=None, telemetry=None):
+    """Run a recording headless and return run statistics.
+
+    `world` defaults to a new World built from the recorded seed. The result includes
+    per-tick step times in milliseconds (`tick_ms`) for comparing builds. With
+    `telemetry` (a file path) every tick is also written there as a telemetry frame,
+    and the result carries the writer's frame-time summary.
+    """
+    seed, inputs = read_recording(path)
+    if world is None:
+        world = World(seed)
+    writer = TelemetryWriter(telemetry) if telemetry else None
+    if writer is not None:
+        profiler.set_collect(True)
+        gc_counter = GCCounter()
+    tick_ms = []
+    clock = time.perf_counter
+    start = clock()
+    try:
+        for frame, inp in enumerate(inputs, 1):
+            t0 = clock()
+            world.step(inp)
+            ms = (clock() - t0) * 1000.0
+            tick_ms.append(ms)
+            if writer is not None:
+                profiler.end_frame()
+                writer.write({"frame": frame, "tick": world.tick, "frame_ms": ms, "stages": profiler.last,
+                              "counts": entity_counts(world), "gc": gc_counter.delta()})
+    finally:
+        summary = None
+        if writer is not None:
+            profiler.set_collect(False)
+            summary = writer.close()
+    seconds = clock() - start
+    return {
+        "world": world,
+        "seed": seed,
+        "ticks": len(inputs),
+        "seconds": seconds,
+        "ticks_per_second": len(inputs) / seconds if seconds > 0 else float("inf"),
+        "tick_ms": tick_ms,
+        "telemetry": summary,
+    }
+
+
+def format_report(stats):
+    tick_ms = sorted(stats["tick_ms"]) or [0.0]
+    world = stats["world"]
+    return ("replay: {ticks} ticks in {seconds:.2f}s ({ticks_per_second:.0f} ticks/s), "
+            "tick mean {mean:.3f} ms, median {median:.3f} ms, max {worst:.3f} ms; "
+            "final tick {tick}, {kills} kills (seed {seed})").format(
+        mean=sum(tick_ms) / len(tick_ms), median=tick_ms[len(tick_ms) // 2], worst=tick_ms[-1],
+        tick=world.tick, kills=world.player.bot_kills, **stats)
@@ -0,0 +1,30 @@
+"""Per-world random number streams.
+
+Every `World` owns a `WorldRNG`: one `random.Random` per kind of randomness, all derived
+from a single seed. Wall layouts, spawn points, bot AI and the boss each draw from
+their own stream, so two worlds built with the same seed play out identically even in
+the same process, and extra draws in one system (say, a new AI behaviour) do not
+reshuffle the wall layout or spawn points.
+
+Functions that take an `rng` argument accept a single stream (anything with
+`randint`, `uniform` and `choice`); without one they fall back to the global
+`random` module as before.
+"""
+
+from __future__ import annotations
+
+import random
+
+STREAMS = ("layout", "spawn", "ai", "boss")
+
+
+class WorldRNG:
+    """Named random streams (`layout`, `spawn`, `ai`, `boss`) derived from one seed."""
+
+    def __init__(self, seed: int | None = None):
+        if seed is None:
+            seed = random.SystemRandom().randrange(2 ** 32)
+        self.seed = seed
+        for name in STREAMS:
+            # string seeds are hashed deterministically (unlike hash() of a tuple)
+            setattr(self, name, random.Random(f"{seed}:{name}"))
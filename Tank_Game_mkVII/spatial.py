@@ -0,0 +1,95 @@
+"""Uniform-grid spatial hash used for broadphase queries between moving entities.
+
+The hash is meant to be cleared and refilled every frame. Entities are registered into
+every cell their bounding circle overlaps, so a point only needs to look at its own cell
+to find every entity that could contain it.
+"""
+
+from __future__ import annotations
+
+import math
+
+# Roughly the diameter of a tank (Tank.radius == 20)
+TANK_CELL_SIZE = 40
+# Smallest cell size for nearest-target searches (bots are sparse compared to bullets)
+TARGET_CELL_SIZE = 64
+
+
+class SpatialHash:
+    """Map grid cells to the entities overlapping them."""
+
+    def __init__(self, cell_size: float = TANK_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self._count = 0
+        self._bounds = None  # (i0, i1, j0, j1) range of occupied cells
+
+    def __len__(self):
+        return self._count
+
+    def clear(self):
+        self.cells.clear()
+        self._count = 0
+        self._bounds = None
+
+    def cell_of(self, x, y):
+        cs = self.cell_size
+        return int(math.floor(x / cs)), int(math.floor(y / cs))
+
+    def _cell_range(self, x, y, radius):
+        cs = self.cell_size
+        i0 = int(math.floor((x - radius) / cs))
+        i1 = int(math.floor((x + radius) / cs))
+        j0 = int(math.floor((y - radius) / cs))
+        j1 = int(math.floor((y + radius) / cs))
+        return i0, i1, j0, j1
+
+    def insert(self, item, x, y, radius=0.0):
+        """Register `item` as a circle at (x, y); `radius` is kept as its hit radius.
+
+        Entries are stored as `(order, item, x, y, radius)` where `order` is the insertion
+        index, so callers can break ties the same way a list scan would.
+        """
+        entry = (self._count, item, x, y, radius)
+        self._count += 1
+        i0, i1, j0, j1 = self._cell_range(x, y, radius)
+        b = self._bounds
+        self._bounds = (i0, i1, j0, j1) if b is None else (min(b[0], i0), max(b[1], i1), min(b[2], j0), max(b[3], j1))
+        cells = self.cells
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                bucket = cells.get((i, j))
+                if bucket is None:
+                    cells[(i, j)] = [entry]
+                else:
+                    bucket.append(entry)
+
+    def nearest(self, x, y):
+        """Return the entry whose registered point is closest to (x, y), or None.
+
+        Searches rings of cells outward from (x, y) and stops once no unvisited cell can
+        hold anything closer. Ties go to the earliest inserted entry, the same item
+        `min(items, key=squared distance)` would return for the insertion-ordered list.
+        """
+        if self._bounds is None:
+            return None
+        cs = self.cell_size
+        ci, cj = self.cell_of(x, y)
+        bi0, bi1, bj0, bj1 = self._bounds
+        # rings beyond this cannot reach any occupied cell
+        max_ring = max(ci - bi0, bi1 - ci, cj - bj0, bj1 - cj)
+        cells = self.cells
+        best = None
+        best_key = None
+        for ring in range(max_ring + 1):
+            if best is not None and best_key[0] < (ring - 1) * (ring - 1) * cs * cs:
+                break
+            for i in range(ci - ring, ci + ring + 1):
+                edge = i == ci - ring or i == ci + ring
+                for j in (range(cj - ring, cj + ring + 1) if edge else (cj - ring, cj + ring)):
+                    for entry in cells.get((i, j), ()):
+                        key = ((entry[2] - x) ** 2 + (entry[3] - y) ** 2, entry[0])
+                        if best_key is None or key < best_key:
+                            best = entry
+                            best_key = key
+        return best
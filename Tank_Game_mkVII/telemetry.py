@@ -0,0 +1,120 @@
+"""Per-frame telemetry written to disk from a background thread.
+
+The frame loop hands one record per frame to a `TelemetryWriter`, which only puts it on
+a queue; a daemon thread formats the records and writes them as JSON lines or CSV, so
+the loop never waits on the disk. The writer also keeps every frame time and summarizes
+them (p50/p95/p99/max) when it is closed, which makes slow degradation over a long
+session easy to spot.
+"""
+
+from __future__ import annotations
+
+import csv
+import gc
+import json
+import queue
+import threading
+
+import numpy as np
+
+from profiler import STAGES
+
+COUNT_FIELDS = ("bullets", "bots", "drones", "boss_bullets")
+GC_FIELDS = ("gc0", "gc1", "gc2")  # collections per generation during the frame
+
+
+def entity_counts(world):
+    """Return the entity counts recorded with every frame."""
+    return {
+        "bullets": len(world.bullets),
+        "bots": len(world.bots),
+        "drones": len(world.player.drones),
+        "boss_bullets": len(world.boss_manager.boss_bullets),
+    }
+
+
+class GCCounter:
+    """Counts garbage collections per generation between calls to `delta()`."""
+
+    def __init__(self):
+        self._last = [s["collections"] for s in gc.get_stats()]
+
+    def delta(self):
+        now = [s["collections"] for s in gc.get_stats()]
+        diff = [a - b for a, b in zip(now, self._last)]
+        self._last = now
+        return diff
+
+
+class TelemetryWriter:
+    """Stream frame records to `path` (`.csv` for CSV, anything else for JSON lines).
+
+    A record is a dict with `frame`, `tick`, `frame_ms`, `stages` (stage -> ms), `counts`
+    (see `entity_counts`), `gc` (collections per generation) and, when the game's
+    `gcmanager` is installed, `gc_ms` (collector pause time during the frame).
+    """
+
+    def __init__(self, path, fmt=None):
+        if fmt is None:
+            fmt = "csv" if str(path).lower().endswith(".csv") else "jsonl"
+        if fmt not in ("csv", "jsonl"):
+            raise ValueError(f"unknown telemetry format {fmt!r}")
+        self.path = path
+        self.fmt = fmt
+        self._frame_ms = []
+        self._queue = queue.SimpleQueue()
+        self._file = open(path, "w", newline="")
+        self._thread = threading.Thread(target=self._run, name="telemetry-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, record):
+        """Queue one frame record; never blocks."""
+        self._queue.put(record)
+
+    def _run(self):
+        f = self._file
+        if self.fmt == "csv":
+            fields = (["frame", "tick", "frame_ms"] + [f"{name}_ms" for name, _ in STAGES]
+                      + list(COUNT_FIELDS) + list(GC_FIELDS) + ["gc_ms"])
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+            writer.writeheader()
+        while True:
+            record = self._queue.get()
+            if record is None:
+                break
+            self._frame_ms.append(record["frame_ms"])
+            if self.fmt == "csv":
+                row = {"frame": record["frame"], "tick": record["tick"], "frame_ms": round(record["frame_ms"], 4)}
+                row.update((f"{name}_ms", round(ms, 4)) for name, ms in record["stages"].items())
+                row.update(record["counts"])
+                row.update(zip(GC_FIELDS, record["gc"]))
+                if "gc_ms" in record:
+                    row["gc_ms"] = round(record["gc_ms"], 4)
+                writer.writerow(row)
+            else:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        f.close()
+
+    def close(self):
+        """Flush every queued record, stop the thread and return the frame-time summary."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        return summarize(self._frame_ms)
+
+
+def summarize(frame_ms):
+    """Return frame-time percentiles (ms) for a list of frame times."""
+    if not frame_ms:
+        return {"frames": 0}
+    values = np.asarray(frame_ms)
+    p50, p95, p99 = np.percentile(values, (50, 95, 99))
+    return {"frames": len(values), "p50": float(p50), "p95": float(p95), "p99": float(p99),
+            "max": float(values.max())}
+
+
+def format_summary(summary):
+    if not summary["frames"]:
+        return "telemetry: no frames recorded"
+    return ("telemetry: {frames} frames, frame time p50 {p50:.2f} ms, p95 {p95:.2f} ms, "
+            "p99 {p99:.2f} ms, max {max:.2f} ms".format(**summary))
@@ -0,0 +1,121 @@
+"""Check that `update_all_bots` and grid separation move bots exactly like the full scan."""
+
+from __future__ import annotations
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import copy
+import random
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import ai_helpers
+from ai_helpers import SEPARATION_RADIUS, neighbour_lists, update_bot_ai, update_all_bots
+from navigation import FlowField
+from walls import create_random_walls
+
+FRAMES = 120
+TOLERANCE = 1e-9
+
+
+@pytest.fixture(autouse=True)
+def array_path(monkeypatch):
+    # compare the array path even for groups small enough to use the per-bot loop
+    monkeypatch.setattr(ai_helpers, "BATCH_AI_MIN_BOTS", 0)
+
+
+def _bots(seed, count, cx, cy, spread):
+    rng = random.Random(seed)
+    return [SimpleNamespace(x=cx + rng.uniform(-spread, spread), y=cy + rng.uniform(-spread, spread),
+                            radius=20, orbit_dir=rng.choice([-1, 1]), wander_angle=rng.uniform(0, 6.28))
+            for _ in range(count)]
+
+
+def _run_both(bots, player, walls=None, flow=None, seed=7):
+    """Step a copy of `bots` through each path and assert they stay together."""
+    scalar = copy.deepcopy(bots)
+    batched = copy.deepcopy(bots)
+    rng_scalar = random.Random(seed)
+    rng_batched = random.Random(seed)
+    for frame in range(FRAMES):
+        if flow is not None:
+            flow.update(walls, player.x, player.y)
+        # scalar path: bots in list order, each one seeing the moves of those before it
+        angles_scalar = [update_bot_ai(bot, scalar, player, walls=walls, flow=flow, rng=rng_scalar)
+                         for bot in scalar]
+        angles_batched = update_all_bots(batched, player, walls=walls, flow=flow, rng=rng_batched)
+        for k, (a, b) in enumerate(zip(scalar, batched)):
+            assert a.x == pytest.approx(b.x, abs=TOLERANCE), (frame, k)
+            assert a.y == pytest.approx(b.y, abs=TOLERANCE), (frame, k)
+        assert angles_batched == pytest.approx(angles_scalar, abs=TOLERANCE), frame
+        assert rng_batched.getstate() == rng_scalar.getstate(), frame
+        # keep the player moving so bots orbit, chase and fall behind walls
+        player.x += 2.0
+        player.y += 1.0 if frame % 40 < 20 else -1.0
+
+
+def test_clustered_bots_without_walls():
+    # tightly packed: every bot pushes on several others each frame
+    bots = _bots(1, 20, 800, 600, 40)
+    _run_both(bots, SimpleNamespace(x=700, y=600, speed=3.0))
+
+
+def test_many_bots_without_walls():
+    bots = _bots(2, 100, 800, 600, 500)
+    _run_both(bots, SimpleNamespace(x=800, y=600, speed=4.0))
+
+
+def test_bots_with_walls_and_flow_field():
+    walls = create_random_walls(seed=3, max_vertical=4, max_horizontal=4)
+    bots = _bots(3, 60, 800, 600, 700)
+    _run_both(bots, SimpleNamespace(x=300, y=300, speed=3.0), walls=walls, flow=FlowField())
+
+
+def test_bots_with_walls_and_patrol():
+    # without a flow field, bots that lose sight of the player patrol
+    walls = create_random_walls(seed=4, max_vertical=4, max_horizontal=4)
+    bots = _bots(4, 60, 800, 600, 700)
+    _run_both(bots, SimpleNamespace(x=300, y=300, speed=3.0), walls=walls)
+
+
+def test_grid_neighbours_match_full_scan():
+    # update_bot_ai with candidates from neighbour_lists against scanning every bot
+    bots = _bots(5, 150, 800, 600, 300)
+    player = SimpleNamespace(x=800, y=600, speed=3.0)
+    scanned = copy.deepcopy(bots)
+    gridded = copy.deepcopy(bots)
+    rng_scanned = random.Random(5)
+    rng_gridded = random.Random(5)
+    reach = SEPARATION_RADIUS + max(0.5, player.speed * 0.75) + 1.0
+    for frame in range(FRAMES):
+        neighbours, first = neighbour_lists(np.array([b.x for b in gridded]), np.array([b.y for b in gridded]), reach)
+        for k, (a, b) in enumerate(zip(scanned, gridded)):
+            update_bot_ai(a, scanned, player, rng=rng_scanned)
+            update_bot_ai(b, gridded, player, neighbors=[gridded[j] for j in neighbours[first[k]:first[k + 1]]],
+                          rng=rng_gridded)
+            assert (a.x, a.y) == (b.x, b.y), (frame, k)
+
+
+def test_neighbour_lists_against_brute_force():
+    rng = np.random.default_rng(6)
+    x, y = rng.uniform(0, 400, (2, 200))
+    neighbours, first = neighbour_lists(x, y, 50.0)
+    for k in range(len(x)):
+        expected = [j for j in range(len(x)) if j != k and np.hypot(x[k] - x[j], y[k] - y[j]) < 50.0]
+        assert neighbours[first[k]:first[k + 1]] == expected
+    assert neighbour_lists(np.zeros(0), np.zeros(0), 50.0) == ([], [0])
+
+
+def test_small_groups_use_the_scalar_loop(monkeypatch):
+    monkeypatch.setattr(ai_helpers, "BATCH_AI_MIN_BOTS", 32)
+    walls = create_random_walls(seed=5, max_vertical=4, max_horizontal=4)
+    bots = _bots(5, 5, 800, 600, 300)
+    _run_both(bots, SimpleNamespace(x=300, y=300, speed=3.0), walls=walls, flow=FlowField())
+
+
+def test_no_bots():
+    assert update_all_bots([], SimpleNamespace(x=0, y=0)) == []
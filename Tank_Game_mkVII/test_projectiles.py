@@ -0,0 +1,110 @@
+"""Check the projectile store's lifecycle: expiry, spawn order and compaction."""
+
+from __future__ import annotations
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import math
+
+from config import WORLD_WIDTH, BULLET_WORLD_MARGIN
+from projectiles import ProjectileStore
+
+WHITE = (255, 255, 255)
+
+
+def _fire(store, x, y, angle=0.0, speed=5.0, ttl=None):
+    return store.spawn(x, y, angle, speed, 10.0, 5, WHITE, "player", ttl=ttl)
+
+
+def _run(store, frames):
+    for _ in range(frames):
+        store.move()
+        store.expire()
+        store.compact()
+
+
+def test_bullets_have_no_lifetime_by_default():
+    store = ProjectileStore()
+    # a slow shot stays in the world far longer than the old five-second limit
+    _fire(store, 100.0, 100.0, speed=0.1)
+    _run(store, 60 * 20)
+    assert len(store) == 1
+
+
+def test_bullets_expire_outside_the_world_margin():
+    store = ProjectileStore()
+    _fire(store, WORLD_WIDTH - 5.0, 600.0, speed=10.0)
+    # still alive while within the margin past the edge...
+    _run(store, (BULLET_WORLD_MARGIN - 10) // 10)
+    assert len(store) == 1
+    # ...and gone once past it
+    _run(store, 3)
+    assert len(store) == 0
+
+
+def test_explicit_lifetimes_count_down():
+    store = ProjectileStore(lifetime=3)
+    _fire(store, 100.0, 100.0)
+    _fire(store, 100.0, 200.0, ttl=5)
+    _run(store, 3)
+    assert store.y[:store.count].tolist() == [200.0]
+    _run(store, 2)
+    assert store.count == 0
+
+
+def test_fast_bullets_expire_in_one_step():
+    store = ProjectileStore()
+    _fire(store, 10.0, 10.0, angle=math.pi, speed=500.0)
+    _run(store, 1)
+    assert store.count == 0
+
+
+def _serials(store):
+    return store.serial[:store.count].tolist()
+
+
+def test_compact_fills_holes_from_the_end():
+    store = ProjectileStore(capacity=4)
+    for k in range(8):  # grows past the initial capacity
+        _fire(store, 10.0 * k, 100.0)
+    assert store.capacity >= 8
+    assert _serials(store) == list(range(8))
+    store.kill([1, 3])
+    store.compact()
+    # swap-and-pop: the holes at 1 and 3 take the live records from slots 6 and 7
+    assert _serials(store) == [0, 6, 2, 7, 4, 5]
+    assert store.x[:store.count].tolist() == [0.0, 60.0, 20.0, 70.0, 40.0, 50.0]
+    assert store.alive[:store.count].all() and not store.alive[store.count:8].any()
+
+
+def test_spawns_reuse_freed_slots_and_keep_counting():
+    store = ProjectileStore()
+    for k in range(5):
+        _fire(store, 10.0 * k, 100.0)
+    store.kill(store.serial[:store.count] % 2 == 0)
+    store.compact()
+    slot = _fire(store, 0.0, 0.0)
+    assert slot == 2
+    assert _serials(store) == [3, 1, 5]
+
+
+def test_hits_come_in_spawn_order():
+    store = ProjectileStore()
+    for k in range(6):
+        _fire(store, 100.0 + k, 100.0)
+    store.kill([0, 2])
+    store.compact()  # slots now hold serials 4, 1, 5, 3
+    hits = store.circle_hits(100.0, 100.0, 50.0)
+    assert store.serial[hits].tolist() == [1, 3, 4, 5]
+
+
+def test_keep_owner():
+    store = ProjectileStore()
+    store.spawn(0.0, 0.0, 0.0, 1.0, 1.0, 1, WHITE, "bot")
+    _fire(store, 1.0, 0.0)
+    store.spawn(2.0, 0.0, 0.0, 1.0, 1.0, 1, WHITE, "boss")
+    _fire(store, 3.0, 0.0)
+    store.keep_owner("player")
+    assert sorted(store.x[:store.count].tolist()) == [1.0, 3.0]
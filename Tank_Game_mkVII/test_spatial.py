@@ -0,0 +1,85 @@
+"""Check the spatial hash queries against plain scans over every entity."""
+
+from __future__ import annotations
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import math
+import random
+
+import pytest
+
+from projectiles import ProjectileStore
+from spatial import SpatialHash, TANK_CELL_SIZE
+
+WHITE = (255, 255, 255)
+
+
+def _tanks(rng, count, size):
+    return [(rng.uniform(-50, size), rng.uniform(-50, size), rng.choice([20, 20, 60])) for _ in range(count)]
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_grid_hits_match_brute_force(seed):
+    rng = random.Random(seed)
+    tanks = _tanks(rng, 40, 600)
+    grid = SpatialHash(TANK_CELL_SIZE)
+    for k, (x, y, r) in enumerate(tanks):
+        grid.insert(k, x, y, r)
+    store = ProjectileStore()
+    for _ in range(400):
+        store.spawn(rng.uniform(-60, 660), rng.uniform(-60, 660), 0.0, 0.0, 1.0, 4, WHITE,
+                    rng.choice(["player", "bot"]))
+    # shuffle slot order away from spawn order
+    store.kill(store.serial[:store.count] % 7 == 0)
+    store.compact()
+
+    hits = [(int(store.serial[slot]), entry[1]) for slot, entry in store.grid_hits(grid, "player")]
+    player = store.live_indices("player")
+    expected = sorted((int(store.serial[i]), k) for i in player for k, (x, y, r) in enumerate(tanks)
+                      if math.hypot(store.x[i] - x, store.y[i] - y) < r)
+    assert hits == expected
+    assert hits  # the layout is dense enough to produce hits
+
+
+def test_grid_hits_on_empty_grid():
+    store = ProjectileStore()
+    store.spawn(0.0, 0.0, 0.0, 0.0, 1.0, 4, WHITE, "player")
+    assert store.grid_hits(SpatialHash()) == []
+
+
+def _nearest_by_scan(points, x, y):
+    return min(range(len(points)), key=lambda k: (points[k][0] - x) ** 2 + (points[k][1] - y) ** 2)
+
+
+@pytest.mark.parametrize("cell_size", [16, 64, 200])
+def test_nearest_matches_min(cell_size):
+    rng = random.Random(cell_size)
+    points = [(rng.uniform(0, 1600), rng.uniform(0, 1200)) for _ in range(60)]
+    grid = SpatialHash(cell_size)
+    for k, (x, y) in enumerate(points):
+        grid.insert(k, x, y)
+    for _ in range(300):
+        x, y = rng.uniform(-200, 1800), rng.uniform(-200, 1400)
+        assert grid.nearest(x, y)[1] == _nearest_by_scan(points, x, y)
+
+
+def test_nearest_breaks_ties_by_insertion_order():
+    # points on a lattice, inserted in shuffled order, queried from points equidistant
+    # to several of them: the first inserted of the tied points must win, as with min()
+    rng = random.Random(4)
+    points = [(100.0 * i, 100.0 * j) for i in range(6) for j in range(6)]
+    rng.shuffle(points)
+    grid = SpatialHash(64)
+    for k, (x, y) in enumerate(points):
+        grid.insert(k, x, y)
+    for i in range(7):
+        for j in range(7):
+            for x, y in ((100.0 * i - 50.0, 100.0 * j - 50.0), (100.0 * i - 50.0, 100.0 * j)):
+                assert grid.nearest(x, y)[1] == _nearest_by_scan(points, x, y), (x, y)
+
+
+def test_nearest_in_empty_grid():
+    assert SpatialHash().nearest(0.0, 0.0) is None
@@ -0,0 +1,71 @@
+"""Check that the visibility table only answers what the exact slab test would."""
+
+from __future__ import annotations
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pytest
+
+from config import WORLD_WIDTH, WORLD_HEIGHT
+from visibility import VisibilityTable, table_for
+from walls import create_random_walls, _slab_line_of_sight
+
+SEGMENTS = 20000
+
+
+def _segments(seed):
+    rng = np.random.default_rng(seed)
+    x1, x2 = rng.uniform(0, WORLD_WIDTH, (2, SEGMENTS))
+    y1, y2 = rng.uniform(0, WORLD_HEIGHT, (2, SEGMENTS))
+    return x1, y1, x2, y2
+
+
+def _assert_agrees(table, seed):
+    x1, y1, x2, y2 = _segments(seed)
+    known, visible = table.lookup_batch(x1, y1, x2, y2)
+    exact = _slab_line_of_sight(x1, y1, x2, y2, table.bounds)
+    assert known.any()
+    np.testing.assert_array_equal(visible[known], exact[known])
+    for k in range(0, SEGMENTS, 97):
+        answer = table.lookup(x1[k], y1[k], x2[k], y2[k])
+        assert answer is None or answer == exact[k]
+    return known
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_table_agrees_with_slab_test(seed):
+    walls = create_random_walls(seed=seed, max_vertical=2 + seed, max_horizontal=2 + seed)
+    table = VisibilityTable(walls.bounds_array)
+    table.build()
+    known = _assert_agrees(table, seed)
+    # both bits are in use: some pairs are decided visible and some blocked
+    _, visible = table.lookup_batch(*_segments(seed))
+    assert visible[known].any() and not visible[known].all()
+
+
+def test_subset_agrees_with_slab_test():
+    walls = create_random_walls(seed=5, max_vertical=4, max_horizontal=4)
+    table = VisibilityTable(walls.bounds_array)
+    table.build()
+    keep = np.ones(len(walls), dtype=bool)
+    keep[[0, len(walls) // 2]] = False
+    smaller = table.subset(keep)
+    np.testing.assert_array_equal(smaller.bounds, walls.bounds_array[keep])
+    _assert_agrees(smaller, 5)
+
+
+def test_empty_layout_is_all_visible():
+    table = VisibilityTable(np.zeros((0, 4)))
+    table.build()
+    known, visible = table.lookup_batch(*_segments(0))
+    assert known.all() and visible.all()
+
+
+def test_tables_are_cached_by_layout():
+    walls = create_random_walls(seed=6)
+    table = table_for(walls.bounds_array)
+    assert table.wait()
+    assert table_for(create_random_walls(seed=6).bounds_array) is table
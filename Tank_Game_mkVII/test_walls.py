@@ -0,0 +1,61 @@
+"""Check that swept wall tests stop fast circles from tunnelling through thin walls."""
+
+from __future__ import annotations
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pytest
+
+from projectiles import ProjectileStore
+from walls import Wall, WallList, swept_circles_hit_walls, walls_block_move, walls_collide_circle
+
+SPEED = 40.0
+RADIUS = 4.0
+
+
+def _thin_wall(cls=WallList):
+    # 16 px thick: a 40 px step from x=485 to x=525 clears it at both ends
+    return cls([Wall(500, 0, 16, 1200)])
+
+
+@pytest.mark.parametrize("cls", [WallList, list])
+def test_fast_circle_does_not_step_over_thin_wall(cls):
+    walls = _thin_wall(cls)
+    x1, y1, x2, y2 = 485.0, 600.0, 485.0 + SPEED, 600.0
+    # neither end position touches the wall, so a test at the end alone would miss it
+    assert not walls_collide_circle(walls, x1, y1, RADIUS)
+    assert not walls_collide_circle(walls, x2, y2, RADIUS)
+    assert swept_circles_hit_walls(np.array([x1]), np.array([y1]), np.array([x2]), np.array([y2]),
+                                   np.array([RADIUS]), walls).tolist() == [True]
+    assert walls_block_move(walls, x1, y1, x2, y2, RADIUS)
+    # the same step back the other way, and a diagonal one
+    assert walls_block_move(walls, x2, y2, x1, y1, RADIUS)
+    assert walls_block_move(walls, 485.0, 600.0, 485.0 + 28.3, 600.0 + 28.3, RADIUS)
+
+
+def test_moves_beside_the_wall_are_free():
+    walls = _thin_wall()
+    assert not walls_block_move(walls, 400.0, 600.0, 440.0, 600.0, RADIUS)
+    assert not walls_block_move(walls, 480.0, 600.0, 480.0, 640.0, RADIUS)
+    # a circle already overlapping the wall may always move out of it
+    assert not walls_block_move(walls, 498.0, 600.0, 458.0, 600.0, RADIUS)
+
+
+def test_fast_bullet_is_stopped_by_thin_wall():
+    walls = _thin_wall()
+    store = ProjectileStore()
+    store.spawn(485.0, 600.0, 0.0, SPEED, 10.0, RADIUS, (255, 255, 255), "player")
+    store.spawn(485.0, 300.0, np.pi, SPEED, 10.0, RADIUS, (255, 255, 255), "player")
+    store.move()
+    assert store.wall_hits(walls).tolist() == [True, False]
+
+
+def test_nothing_hits_while_collision_is_off():
+    walls = _thin_wall()
+    walls.collision = False
+    assert not walls_block_move(walls, 485.0, 600.0, 525.0, 600.0, RADIUS)
+    assert not swept_circles_hit_walls(np.array([485.0]), np.array([600.0]), np.array([525.0]),
+                                       np.array([600.0]), np.array([RADIUS]), walls).any()
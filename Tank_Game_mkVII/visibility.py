@@ -0,0 +1,225 @@
+"""Precomputed potentially-visible-set (PVS) for a static wall layout.
+
+The world is divided into a coarse grid. For every pair of cells the table stores two
+bits, packed with `np.packbits`:
+
+- *visible*: no wall touches the convex hull of the two cells, so every segment between
+  a point in one cell and a point in the other is clear;
+- *blocked*: a single wall spans the whole corridor between the cells, so every such
+  segment passes through that wall.
+
+Pairs with neither bit set are close to a wall edge and need an exact test. Both bits are
+conservative, so answers from the table always agree with the exact slab test in
+`walls.line_of_sight_batch`.
+
+Building the table takes about 0.3 s, and on a single core a build running alongside the
+frame loop roughly doubles the cost of each world step while it lasts. Layouts are
+therefore built before they are played: the world builds its first layout up front and
+prepares the next one while the game-over screen or the boss fade-in is showing (see
+`walls.prepare_layout`). Finished tables are cached by layout (`table_for`), and when a
+respawn drops walls near the player, `subset` derives the smaller layout's table from
+the prepared one without another build. A layout nobody prepared still works: its table
+is built on a background thread and, until `ready` is set, every lookup reports
+"undecided".
+"""
+
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+
+from config import WORLD_WIDTH, WORLD_HEIGHT
+
+PVS_CELL_SIZE = 40
+# Approximate number of (cell, cell, wall) triples handled per array operation in a build
+PVS_BUILD_BATCH = 1 << 17
+# Number of recently used layouts whose tables `table_for` keeps
+PVS_CACHE_SIZE = 4
+
+_cache = {}
+
+
+def table_for(bounds):
+    """Return the cached table for the layout with these wall bounds, or start building one."""
+    bounds = np.array(bounds, dtype=float).reshape(-1, 4)
+    key = bounds.tobytes()
+    table = _cache.pop(key, None)
+    if table is None:
+        table = VisibilityTable(bounds).start()
+    _remember(key, table)
+    return table
+
+
+def _remember(key, table):
+    _cache[key] = table  # dicts keep insertion order, so the first key is the oldest
+    while len(_cache) > PVS_CACHE_SIZE:
+        del _cache[next(iter(_cache))]
+
+
+class VisibilityTable:
+    """Bit-packed cell-to-cell visibility for one wall layout."""
+
+    def __init__(self, bounds, cell_size=PVS_CELL_SIZE, world_width=WORLD_WIDTH, world_height=WORLD_HEIGHT):
+        # (n, 4) array of wall bounds (left, top, right, bottom); copied so later layout
+        # changes cannot affect a build in progress
+        self.bounds = np.array(bounds, dtype=float).reshape(-1, 4)
+        self.cell_size = cell_size
+        self.cols = -(-world_width // cell_size)
+        self.rows = -(-world_height // cell_size)
+        self.ready = False
+        self._visible = None
+        self._blocked = None
+        # per cell pair, 1 + the index of a wall that blocks it (0: none); see `subset`
+        self._blocker = None
+        self._thread = None
+
+    def start(self):
+        """Build the table on a daemon thread so the frame loop never waits for it."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.build, name="pvs-build", daemon=True)
+            self._thread.start()
+        return self
+
+    def wait(self, timeout=None):
+        """Wait for a build started with `start()`; return whether the table is ready."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.ready
+
+    def build(self):
+        cs = float(self.cell_size)
+        n_cells = self.cols * self.rows
+        cell = np.arange(n_cells)
+        # cell bounds and centres (cells are indexed row-major: k = j * cols + i)
+        cl = (cell % self.cols) * cs
+        ct = (cell // self.cols) * cs
+        cr = cl + cs
+        cb = ct + cs
+        cx = cl + cs / 2
+        cy = ct + cs / 2
+        half = cs / 2
+
+        wl, wt, wr, wb = (self.bounds[:, k][None, None, :] for k in range(4))
+        wcx = (wl + wr) / 2
+        wcy = (wt + wb) / 2
+        # projected half-extent of a cell plus the wall, per unit of |nx| and |ny|
+        reach_x = half + (wr - wl) / 2
+        reach_y = half + (wb - wt) / 2
+
+        visible = np.zeros((n_cells, n_cells), dtype=bool)
+        blocker = np.zeros((n_cells, n_cells), dtype=np.min_scalar_type(len(self.bounds)))
+        if len(self.bounds) == 0:
+            visible[:] = True
+        else:
+            # Both relations are symmetric, so only pairs (a, b) with b >= a are tested and
+            # the result is mirrored. Rows are taken in batches sized so each array
+            # operation is large: the thread then spends its time inside NumPy with the GIL
+            # released instead of holding it for many small calls.
+            batch = max(1, PVS_BUILD_BATCH // (n_cells * len(self.bounds)))
+            for start in range(0, n_cells, batch):
+                rows = slice(start, start + batch)
+                # arrays of shape (rows in the batch, cells from `start` on, walls)
+                al, at, ar, ab, ax, ay = (v[rows, None, None] for v in (cl, ct, cr, cb, cx, cy))
+                bl, bt, br, bb, bx, by = (v[None, start:, None] for v in (cl, ct, cr, cb, cx, cy))
+                hl = np.minimum(al, bl)
+                hr = np.maximum(ar, br)
+                ht = np.minimum(at, bt)
+                hb = np.maximum(ab, bb)
+
+                # Separating-axis test between the hull of both cells and each wall. The
+                # hull of two equal squares only has edges along x, y and the line joining
+                # the centres, so those three axes are enough.
+                sep = (hr < wl) | (hl > wr) | (hb < wt) | (ht > wb)
+                nx = ay - by
+                ny = bx - ax
+                offset = (ax - wcx) * nx + (ay - wcy) * ny
+                sep |= np.abs(offset) > reach_x * np.abs(nx) + reach_y * np.abs(ny)
+                visible[rows, start:] = np.all(sep, axis=2)
+
+                # A wall blocks every segment if both cells lie on opposite sides of it
+                # along one axis and the corridor between them fits strictly inside the
+                # wall along the other axis.
+                across_x = ((ar < wl) & (bl > wr)) | ((br < wl) & (al > wr))
+                inside_y = (wt < ht) & (hb < wb)
+                across_y = ((ab < wt) & (bt > wb)) | ((bb < wt) & (at > wb))
+                inside_x = (wl < hl) & (hr < wr)
+                blocks = (across_x & inside_y) | (across_y & inside_x)
+                blocker[rows, start:] = np.where(np.any(blocks, axis=2), np.argmax(blocks, axis=2) + 1, 0)
+            visible |= visible.T
+            np.maximum(blocker, blocker.T, out=blocker)
+
+        self._finish(visible, blocker)
+
+    def _finish(self, visible, blocker):
+        self._visible = np.packbits(visible, axis=1)
+        self._blocked = np.packbits(blocker > 0, axis=1)
+        self._blocker = blocker
+        self.ready = True
+
+    def subset(self, keep):
+        """Return the table for this layout with only the walls where `keep` is True.
+
+        Removing walls never hides a visible pair, so the visible bits carry over. A
+        blocked pair stays blocked if the wall recorded as blocking it is kept; pairs
+        whose recorded wall was removed become undecided, even if another wall still
+        blocks them. No build is needed, only a few array passes (a few milliseconds).
+        Waits for this table's build if it is still running.
+        """
+        if not self.wait():
+            self.build()
+        keep = np.asarray(keep, dtype=bool)
+        if keep.all():
+            return self
+        table = VisibilityTable(self.bounds[keep], self.cell_size,
+                                self.cols * self.cell_size, self.rows * self.cell_size)
+        # remap blocker numbers to the kept walls; removed walls map to 0
+        remap = np.zeros(len(self.bounds) + 1, dtype=self._blocker.dtype)
+        remap[1:][keep] = np.arange(1, int(keep.sum()) + 1)
+        table._finish(np.unpackbits(self._visible, axis=1, count=self.cols * self.rows).astype(bool),
+                      remap[self._blocker])
+        _remember(table.bounds.tobytes(), table)
+        return table
+
+    def _cells(self, x, y):
+        cs = self.cell_size
+        i = np.floor(np.asarray(x, dtype=float) / cs).astype(np.int64)
+        j = np.floor(np.asarray(y, dtype=float) / cs).astype(np.int64)
+        in_grid = (i >= 0) & (i < self.cols) & (j >= 0) & (j < self.rows)
+        return np.where(in_grid, j * self.cols + i, 0), in_grid
+
+    @staticmethod
+    def _bit(packed, a, b):
+        return ((packed[a, b >> 3] >> (7 - (b & 7))) & 1).astype(bool)
+
+    def lookup_batch(self, x1, y1, x2, y2):
+        """Return `(known, visible)` boolean arrays for many segments.
+
+        `visible` is only meaningful where `known` is True; the rest need an exact test.
+        """
+        n = np.asarray(x1).shape[0]
+        if not self.ready:
+            return np.zeros(n, dtype=bool), np.zeros(n, dtype=bool)
+        a, in_a = self._cells(x1, y1)
+        b, in_b = self._cells(x2, y2)
+        vis = self._bit(self._visible, a, b)
+        blk = self._bit(self._blocked, a, b)
+        known = in_a & in_b & (vis | blk)
+        return known, vis & known
+
+    def lookup(self, x1, y1, x2, y2):
+        """Return True/False when the table decides the segment, or None if it cannot."""
+        if not self.ready:
+            return None
+        cs = self.cell_size
+        i1, j1, i2, j2 = int(x1 // cs), int(y1 // cs), int(x2 // cs), int(y2 // cs)
+        if not (0 <= i1 < self.cols and 0 <= j1 < self.rows and 0 <= i2 < self.cols and 0 <= j2 < self.rows):
+            return None
+        a = j1 * self.cols + i1
+        b = j2 * self.cols + i2
+        shift = 7 - (b & 7)
+        if (self._visible[a, b >> 3] >> shift) & 1:
+            return True
+        if (self._blocked[a, b >> 3] >> shift) & 1:
+            return False
+        return None
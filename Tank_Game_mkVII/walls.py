@@ -1,7 +1,9 @@
 import pygame
 import math
 import random
+import numpy as np
 from config import WORLD_WIDTH, WORLD_HEIGHT, GREY
+from visibility import table_for
 
 # Approximate player radius (must match Tank.radius in `core.py`).
 # We avoid importing `core` to prevent circular imports.
@@ -11,36 +13,268 @@ MIN_WALL_CLEARANCE = PLAYER_RADIUS * 2 + 4
 
 
 class Wall:
-    """Axis-aligned rectangular wall."""
+    """Axis-aligned rectangular wall.
+
+    Geometry is fixed when the wall is created: the integer bounds (`left`, `top`,
+    `right`, `bottom`) are computed once so collision queries never allocate, and the
+    caches a `WallList` keeps for its layout (broadphase, bounds array, wall layer,
+    visibility table) rely on them never changing. Assigning `x`, `y`, `w`, `h` or a
+    bound raises AttributeError; to move a wall, replace it in its list. `rect` returns
+    a new `pygame.Rect` on every access.
+    """
+    _GEOMETRY = frozenset(("x", "y", "w", "h", "left", "top", "right", "bottom"))
+
     def __init__(self, x, y, w, h, color=GREY):
-        self.x = x
-        self.y = y
-        self.w = w
-        self.h = h
+        set_attr = object.__setattr__
+        set_attr(self, "x", x)
+        set_attr(self, "y", y)
+        set_attr(self, "w", w)
+        set_attr(self, "h", h)
+        set_attr(self, "left", int(x))
+        set_attr(self, "top", int(y))
+        set_attr(self, "right", self.left + int(w))
+        set_attr(self, "bottom", self.top + int(h))
         self.color = color
 
+    def __setattr__(self, name, value):
+        if name in Wall._GEOMETRY:
+            raise AttributeError(f"wall geometry is read-only; replace the wall instead of setting {name!r}")
+        object.__setattr__(self, name, value)
+
     @property
     def rect(self):
-        return pygame.Rect(int(self.x), int(self.y), int(self.w), int(self.h))
+        return pygame.Rect(self.left, self.top, self.right - self.left, self.bottom - self.top)
 
     def draw(self, win, cam_x, cam_y):
-        r = self.rect
-        draw_rect = pygame.Rect(r.x - cam_x, r.y - cam_y, r.w, r.h)
-        pygame.draw.rect(win, self.color, draw_rect)
+        pygame.draw.rect(win, self.color, (self.left - cam_x, self.top - cam_y, self.right - self.left, self.bottom - self.top))
 
     def collides_circle(self, cx, cy, radius):
         """Return True if a circle at (cx,cy) with radius intersects this wall."""
         # Find closest point on rect to circle center
-        r = self.rect
-        closest_x = max(r.left, min(cx, r.right))
-        closest_y = max(r.top, min(cy, r.bottom))
+        closest_x = max(self.left, min(cx, self.right))
+        closest_y = max(self.top, min(cy, self.bottom))
         dx = cx - closest_x
         dy = cy - closest_y
         return dx * dx + dy * dy < radius * radius
 
     def collides_point(self, x, y):
-        r = self.rect
-        return r.left <= x <= r.right and r.top <= y <= r.bottom
+        return self.left <= x <= self.right and self.top <= y <= self.bottom
+
+
+# Cell size of the static wall broadphase grid (a few tank diameters)
+WALL_INDEX_CELL_SIZE = 64
+
+
+class WallIndex:
+    """Static broadphase grid over a wall layout.
+
+    Maps grid cells to the walls whose rect overlaps them, so circle, point and segment
+    queries only look at walls near the query instead of scanning the whole layout.
+    Build once per layout; `WallList` rebuilds it automatically when the layout changes.
+    """
+    def __init__(self, walls, cell_size=WALL_INDEX_CELL_SIZE):
+        self.walls = list(walls)
+        self.cell_size = cell_size
+        self.cells = {}
+        for k, w in enumerate(self.walls):
+            for i in range(w.left // cell_size, w.right // cell_size + 1):
+                for j in range(w.top // cell_size, w.bottom // cell_size + 1):
+                    self.cells.setdefault((i, j), []).append(k)
+
+    def _gather(self, cells):
+        found = set()
+        for c in cells:
+            found.update(self.cells.get(c, ()))
+        # keep layout order so results match a linear scan
+        return [self.walls[k] for k in sorted(found)]
+
+    def near_circle(self, x, y, radius):
+        """Return walls whose cells overlap the bounding box of the circle, in layout order."""
+        cs = self.cell_size
+        i0 = int(math.floor((x - radius) / cs))
+        i1 = int(math.floor((x + radius) / cs))
+        j0 = int(math.floor((y - radius) / cs))
+        j1 = int(math.floor((y + radius) / cs))
+        if i0 == i1 and j0 == j1:
+            return [self.walls[k] for k in self.cells.get((i0, j0), ())]
+        return self._gather((i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1))
+
+    def segment_cells(self, x1, y1, x2, y2):
+        """Return the grid cells crossed by the segment (grid DDA traversal).
+
+        When the segment passes exactly through a cell corner both side cells are
+        included, so no wall touching the segment can be missed.
+        """
+        cs = self.cell_size
+        i = int(math.floor(x1 / cs))
+        j = int(math.floor(y1 / cs))
+        i_end = int(math.floor(x2 / cs))
+        j_end = int(math.floor(y2 / cs))
+        dx = x2 - x1
+        dy = y2 - y1
+        step_i = 1 if dx > 0 else -1
+        step_j = 1 if dy > 0 else -1
+        t_max_x = ((i + (step_i > 0)) * cs - x1) / dx if dx else math.inf
+        t_max_y = ((j + (step_j > 0)) * cs - y1) / dy if dy else math.inf
+        t_delta_x = cs / abs(dx) if dx else math.inf
+        t_delta_y = cs / abs(dy) if dy else math.inf
+
+        cells = [(i, j)]
+        steps = abs(i_end - i) + abs(j_end - j)
+        while steps > 0:
+            if t_max_x < t_max_y:
+                i += step_i
+                t_max_x += t_delta_x
+                steps -= 1
+            elif t_max_y < t_max_x:
+                j += step_j
+                t_max_y += t_delta_y
+                steps -= 1
+            else:
+                # exactly through a corner: include both neighbours, then step diagonally
+                cells.append((i + step_i, j))
+                cells.append((i, j + step_j))
+                i += step_i
+                j += step_j
+                t_max_x += t_delta_x
+                t_max_y += t_delta_y
+                steps -= 2
+            cells.append((i, j))
+        return cells
+
+    def near_segment(self, x1, y1, x2, y2):
+        """Return walls in the cells crossed by the segment, in layout order."""
+        return self._gather(self.segment_cells(x1, y1, x2, y2))
+
+    def near_swept_circle(self, x1, y1, x2, y2, radius):
+        """Return walls near the path of a circle moving from (x1,y1) to (x2,y2), in layout order.
+
+        Walks the cells crossed by the centre (grid DDA) and widens each by the cells the
+        radius can reach. Moves shorter than a cell just use the circle around the path.
+        """
+        length = math.hypot(x2 - x1, y2 - y1)
+        if length <= self.cell_size:
+            return self.near_circle((x1 + x2) / 2, (y1 + y2) / 2, radius + length / 2)
+        reach = int(math.ceil(radius / self.cell_size))
+        cells = set()
+        for i, j in self.segment_cells(x1, y1, x2, y2):
+            for di in range(-reach, reach + 1):
+                for dj in range(-reach, reach + 1):
+                    cells.add((i + di, j + dj))
+        return self._gather(cells)
+
+    def collides_circle(self, x, y, radius):
+        for w in self.near_circle(x, y, radius):
+            if w.collides_circle(x, y, radius):
+                return True
+        return False
+
+    def line_of_sight(self, x1, y1, x2, y2):
+        for w in self.near_segment(x1, y1, x2, y2):
+            if segment_intersects_rect(x1, y1, x2, y2, w.rect):
+                return False
+        return True
+
+
+class WallList(list):
+    """A list of walls that keeps a `WallIndex` in sync with its contents.
+
+    Any mutation (append, clear/extend as done by `respawn_walls_avoiding_player`,
+    pop/insert/remove as done by `ensure_connectivity`, ...) bumps `version` and drops the
+    cached index and wall layer; the next `broadphase` or `layer` access rebuilds them.
+
+    `visible` and `collision` switch drawing and collision for the whole layout (the
+    boss fight turns both off); a plain list of walls is always visible and solid.
+    """
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.visible = True
+        self.collision = True
+        self.version = 0
+        self._index = None
+        self._bounds = None
+        self._pvs = None
+        self._layer = None
+
+    def _changed(self):
+        self.version += 1
+        self._index = None
+        self._bounds = None
+        # an in-flight PVS build for the old layout simply finishes and is dropped
+        self._pvs = None
+        self._layer = None
+
+    @property
+    def broadphase(self):
+        if self._index is None:
+            self._index = WallIndex(self)
+        return self._index
+
+    @property
+    def bounds_array(self):
+        if self._bounds is None:
+            self._bounds = wall_bounds_array(self)
+        return self._bounds
+
+    @property
+    def layer(self):
+        """World-sized surface with every wall drawn on it (see `draw_walls`)."""
+        if self._layer is None:
+            self._layer = render_wall_layer(self)
+        return self._layer
+
+    @property
+    def pvs(self):
+        """Visibility table for this layout, from the cache or else built in the background."""
+        if self._pvs is None:
+            self._pvs = table_for(self.bounds_array)
+        return self._pvs
+
+
+def _invalidating(method):
+    def wrapper(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self._changed()
+        return result
+    wrapper.__name__ = method.__name__
+    return wrapper
+
+
+for _name in ("append", "extend", "insert", "remove", "pop", "clear", "sort", "reverse",
+              "__setitem__", "__delitem__", "__iadd__", "__imul__"):
+    setattr(WallList, _name, _invalidating(getattr(list, _name)))
+del _name
+
+
+def wall_bounds_array(walls):
+    """Return an (n, 4) float array of wall bounds as columns left, top, right, bottom."""
+    if isinstance(walls, WallList) and walls._bounds is not None:
+        return walls._bounds
+    return np.array([(w.left, w.top, w.right, w.bottom) for w in walls], dtype=float).reshape(-1, 4)
+
+
+def wall_index(walls):
+    """Return a `WallIndex` for `walls`, reusing the cached one for a `WallList`."""
+    if isinstance(walls, WallList):
+        return walls.broadphase
+    return WallIndex(walls)
+
+
+def _solid(walls):
+    """True if `walls` has walls and their collision is switched on (see `WallList`)."""
+    return bool(walls) and getattr(walls, "collision", True)
+
+
+def walls_collide_circle(walls, x, y, radius):
+    """Return True if a circle at (x,y) with `radius` intersects any wall in `walls`."""
+    if not _solid(walls):
+        return False
+    if isinstance(walls, WallList):
+        return walls.broadphase.collides_circle(x, y, radius)
+    for w in walls:
+        if w.collides_circle(x, y, radius):
+            return True
+    return False
 
 
 def resolve_circle_against_wall(entity, wall):
@@ -48,10 +282,9 @@ def resolve_circle_against_wall(entity, wall):
     Entity must have `x`, `y`, and `radius` attributes and will be modified in-place.
     """
     cx, cy, r = entity.x, entity.y, entity.radius
-    rect = wall.rect
     # closest point
-    closest_x = max(rect.left, min(cx, rect.right))
-    closest_y = max(rect.top, min(cy, rect.bottom))
+    closest_x = max(wall.left, min(cx, wall.right))
+    closest_y = max(wall.top, min(cy, wall.bottom))
     dx = cx - closest_x
     dy = cy - closest_y
     dist2 = dx * dx + dy * dy
@@ -77,8 +310,10 @@ def resolve_circle_against_wall(entity, wall):
 
 
 def resolve_circle_against_walls(entity, walls):
-    if not walls:
+    if not _solid(walls):
         return
+    if isinstance(walls, WallList):
+        walls = walls.broadphase.near_circle(entity.x, entity.y, entity.radius)
     for w in walls:
         if w.collides_circle(entity.x, entity.y, entity.radius):
             resolve_circle_against_wall(entity, w)
@@ -86,7 +321,7 @@ def resolve_circle_against_walls(entity, walls):
 
 def create_default_walls():
     """Create a set of walls that separate the map but leave gaps for connectivity."""
-    walls = []
+    walls = WallList()
     W = WORLD_WIDTH
     H = WORLD_HEIGHT
     # Keep the old default behavior as one deterministic layout
@@ -120,17 +355,19 @@ def create_default_walls():
     return walls
 
 
-def create_random_walls(seed: int | None = None, max_vertical: int = 2, max_horizontal: int = 2):
+def create_random_walls(seed: int | None = None, max_vertical: int = 2, max_horizontal: int = 2, rng=None):
     """Create randomized walls while leaving guaranteed passages so the map remains accessible.
 
     This function places a small number of long vertical and horizontal walls at random
     positions, and ensures each wall has at least one gap so it can't fully block the map.
-    The randomness is seeded for reproducibility.
+    Draws come from `rng` (a `random.Random` stream, e.g. `WorldRNG.layout`); with
+    only `seed` a private stream is seeded from it, otherwise the global `random`
+    module is used. The global random state is never reseeded.
     """
-    if seed is not None:
-        random.seed(seed)
+    if rng is None:
+        rng = random.Random(seed) if seed is not None else random
 
-    walls = []
+    walls = WallList()
     W = WORLD_WIDTH
     H = WORLD_HEIGHT
 
@@ -143,9 +380,9 @@ def create_random_walls(seed: int | None = None, max_vertical: int = 2, max_hori
         while not placed and attempts < 30:
             attempts += 1
             # Choose x in safe margins
-            x = random.randint(int(W * 0.15), int(W * 0.85))
-            gap_h = random.randint(120, 300)
-            gap_center = random.randint(int(H * 0.2), int(H * 0.8))
+            x = rng.randint(int(W * 0.15), int(W * 0.85))
+            gap_h = rng.randint(120, 300)
+            gap_center = rng.randint(int(H * 0.2), int(H * 0.8))
             gap_y = max(20, gap_center - gap_h // 2)
             top_rect = pygame.Rect(x, 0, wall_thickness, gap_y) if gap_y > 8 else None
             bottom_h = H - (gap_y + gap_h)
@@ -173,9 +410,9 @@ def create_random_walls(seed: int | None = None, max_vertical: int = 2, max_hori
         attempts = 0
         while not placed and attempts < 30:
             attempts += 1
-            y = random.randint(int(H * 0.15), int(H * 0.85))
-            gap_w = random.randint(120, 300)
-            gap_center = random.randint(int(W * 0.2), int(W * 0.8))
+            y = rng.randint(int(H * 0.15), int(H * 0.85))
+            gap_w = rng.randint(120, 300)
+            gap_center = rng.randint(int(W * 0.2), int(W * 0.8))
             gap_x = max(20, gap_center - gap_w // 2)
             left_rect = pygame.Rect(0, y, gap_x, wall_thickness) if gap_x > 8 else None
             right_w = W - (gap_x + gap_w)
@@ -198,12 +435,12 @@ def create_random_walls(seed: int | None = None, max_vertical: int = 2, max_hori
 
     # Add a couple of small randomized blocks with passages
     for i in range(2):
-        bx = random.randint(int(W * 0.3), int(W * 0.7))
-        by = random.randint(int(H * 0.3), int(H * 0.7))
-        bw = random.randint(40, 120)
-        bh = random.randint(40, 160)
+        bx = rng.randint(int(W * 0.3), int(W * 0.7))
+        by = rng.randint(int(H * 0.3), int(H * 0.7))
+        bw = rng.randint(40, 120)
+        bh = rng.randint(40, 160)
         # carve a passage along one side
-        passage_side = random.choice(['top', 'bottom', 'left', 'right'])
+        passage_side = rng.choice(['top', 'bottom', 'left', 'right'])
         # Build candidate rect and ensure clearance from other walls
         if passage_side == 'top':
             cand = pygame.Rect(bx, by + int(bh * 0.3), bw, int(bh * 0.7))
@@ -225,23 +462,32 @@ def create_random_walls(seed: int | None = None, max_vertical: int = 2, max_hori
     return walls
 
 
-# Add global visibility flag and setter
-WALLS_VISIBLE = True
-WALLS_COLLISION = True
+# Background colour of the cached wall layer, treated as transparent when blitting
+WALL_LAYER_COLORKEY = (255, 0, 255)
 
-def set_walls_visible(v: bool):
-    global WALLS_VISIBLE
-    WALLS_VISIBLE = bool(v)
 
-# Add setter for wall collision
-def set_walls_collision(v: bool):
-    global WALLS_COLLISION
-    WALLS_COLLISION = bool(v)
+def render_wall_layer(walls):
+    """Rasterize `walls` once into a world-sized colorkeyed surface."""
+    layer = pygame.Surface((WORLD_WIDTH, WORLD_HEIGHT))
+    layer.fill(WALL_LAYER_COLORKEY)
+    for w in walls:
+        w.draw(layer, 0, 0)
+    if pygame.display.get_surface() is not None:
+        layer = layer.convert()
+    # run-length encoding makes blitting the mostly empty layer cheap
+    layer.set_colorkey(WALL_LAYER_COLORKEY, pygame.RLEACCEL)
+    return layer
 
 
 def draw_walls(win, walls, cam_x=0, cam_y=0):
     # skip drawing if walls are hidden (e.g. during boss fight)
-    if not WALLS_VISIBLE:
+    if not getattr(walls, "visible", True):
+        return
+    if isinstance(walls, WallList):
+        # one blit of the camera's view of the cached layer; ceil matches the
+        # truncation Wall.draw applies to `left - cam_x` for on-screen walls
+        view_w, view_h = win.get_size()
+        win.blit(walls.layer, (0, 0), (math.ceil(cam_x), math.ceil(cam_y), view_w, view_h))
         return
     for w in walls:
         w.draw(win, cam_x, cam_y)
@@ -251,23 +497,21 @@ def is_position_free(x, y, radius, walls):
     """Return True if a circle at (x,y) with `radius` does not intersect any wall and is inside world bounds."""
     if x - radius < 0 or y - radius < 0 or x + radius > WORLD_WIDTH or y + radius > WORLD_HEIGHT:
         return False
-    if not walls:
-        return True
-    for w in walls:
-        if w.collides_circle(x, y, radius):
-            return False
-    return True
+    return not walls_collide_circle(walls, x, y, radius)
 
 
-def find_free_position(radius, walls, tries: int = 1000):
+def find_free_position(radius, walls, tries: int = 1000, rng=None):
     """Try to find a free (x,y) where a circle of `radius` does not intersect walls.
 
-    Uses random sampling then falls back to a local spiral search around center.
+    Uses random sampling (from `rng`, default: `random`) then falls back to a local
+    spiral search around center.
     """
+    if rng is None:
+        rng = random
     # Random sampling
     for _ in range(tries):
-        x = random.randint(radius, WORLD_WIDTH - radius)
-        y = random.randint(radius, WORLD_HEIGHT - radius)
+        x = rng.randint(radius, WORLD_WIDTH - radius)
+        y = rng.randint(radius, WORLD_HEIGHT - radius)
         if is_position_free(x, y, radius, walls):
             return x, y
 
@@ -318,16 +562,14 @@ def rect_min_distance(r1: pygame.Rect, r2: pygame.Rect) -> float:
     return math.hypot(dx, dy)
 
 
-def _cell_grid_reachable(start, walls, cell_size=32):
-    """Return a set of reachable cell indices (i,j) starting from start=(x,y)."""
-    sx, sy = start
+def _blocked_cells(walls, cell_size=32):
+    """Return the set of grid cells (i,j) overlapped by any wall."""
     cols = (WORLD_WIDTH + cell_size - 1) // cell_size
     rows = (WORLD_HEIGHT + cell_size - 1) // cell_size
 
     def cell_rect(i, j):
         return pygame.Rect(i * cell_size, j * cell_size, cell_size, cell_size)
 
-    # build blocked cells from walls
     blocked = set()
     if walls:
         for w in walls:
@@ -341,6 +583,17 @@ def _cell_grid_reachable(start, walls, cell_size=32):
                     # precise check
                     if r.colliderect(cell_rect(i, j)):
                         blocked.add((i, j))
+    return blocked
+
+
+def _cell_grid_reachable(start, walls, cell_size=32):
+    """Return a set of reachable cell indices (i,j) starting from start=(x,y)."""
+    sx, sy = start
+    cols = (WORLD_WIDTH + cell_size - 1) // cell_size
+    rows = (WORLD_HEIGHT + cell_size - 1) // cell_size
+
+    # build blocked cells from walls
+    blocked = _blocked_cells(walls, cell_size)
 
     # start cell
     si = min(cols - 1, max(0, int(sx) // cell_size))
@@ -502,46 +755,214 @@ def segment_intersects_rect(x1, y1, x2, y2, rect):
     return False
 
 
+# Segment count from which line_of_sight_batch uses array operations instead of a loop
+LOS_BATCH_MIN_SEGMENTS = 24
+
+
 def line_of_sight(x1, y1, x2, y2, walls):
     """Return True if the segment between (x1,y1) and (x2,y2) is not blocked by any wall."""
     if not walls:
         return True
+    if isinstance(walls, WallList):
+        visible = walls.pvs.lookup(x1, y1, x2, y2)
+        if visible is not None:
+            return visible
+        return walls.broadphase.line_of_sight(x1, y1, x2, y2)
     for w in walls:
         if segment_intersects_rect(x1, y1, x2, y2, w.rect):
             return False
     return True
 
-# Patch all wall objects' collides_circle to respect WALLS_COLLISION
-# (Assumes Wall class has a collides_circle method)
-def patch_wall_collision():
-    from types import MethodType
-    def new_collides_circle(self, x, y, r):
-        from walls import WALLS_COLLISION
-        if not WALLS_COLLISION:
+def line_of_sight_batch(x1, y1, x2, y2, walls):
+    """Vectorized `line_of_sight` for many segments at once.
+
+    `x1`, `y1`, `x2`, `y2` are equal-length arrays of segment endpoints (e.g. every bot
+    to the player). All segments are tested against all wall AABBs with a slab test in a
+    single pass. Returns a boolean array, True where the segment is not blocked.
+    Segments that only touch a wall's boundary are treated as unblocked. For a `WallList`
+    the layout's visibility table answers most segments and only the rest are slab-tested.
+    Fewer than `LOS_BATCH_MIN_SEGMENTS` segments are tested one by one with
+    `line_of_sight`, which is cheaper than the array setup at that size.
+    """
+    if walls and len(x1) < LOS_BATCH_MIN_SEGMENTS:
+        return np.array([line_of_sight(a, b, c, d, walls) for a, b, c, d in zip(x1, y1, x2, y2)], dtype=bool)
+    x1 = np.asarray(x1, dtype=float)
+    y1 = np.asarray(y1, dtype=float)
+    x2 = np.asarray(x2, dtype=float)
+    y2 = np.asarray(y2, dtype=float)
+    if not walls or x1.size == 0:
+        return np.ones(x1.shape[0], dtype=bool)
+    if isinstance(walls, WallList):
+        # Read what we can from the visibility table; slab-test only the undecided rest
+        known, visible = walls.pvs.lookup_batch(x1, y1, x2, y2)
+        if known.any():
+            rest = ~known
+            if rest.any():
+                visible[rest] = _slab_line_of_sight(x1[rest], y1[rest], x2[rest], y2[rest], walls.bounds_array)
+            return visible
+        b = walls.bounds_array
+    else:
+        b = wall_bounds_array(walls)
+    return _slab_line_of_sight(x1, y1, x2, y2, b)
+
+
+def _slab_line_of_sight(x1, y1, x2, y2, b):
+    left, top, right, bottom = b[:, 0], b[:, 1], b[:, 2], b[:, 3]
+    crosses = _segments_cross_boxes(x1[:, None], y1[:, None], x2[:, None], y2[:, None], left, top, right, bottom)
+    return ~np.any(crosses, axis=1)
+
+
+def _segments_cross_boxes(x1, y1, x2, y2, left, top, right, bottom):
+    """Elementwise (broadcasting) slab test: does each segment pass through the box interior?
+
+    Strict comparison: grazing an edge or corner does not count, as in
+    `segment_intersects_rect`.
+    """
+    def slab(p, d, lo, hi):
+        # Parametric interval [t_enter, t_exit] where p + t*d lies within [lo, hi]
+        moving = d != 0
+        safe_d = np.where(moving, d, 1.0)
+        t_a = (lo - p) / safe_d
+        t_b = (hi - p) / safe_d
+        inside = (lo < p) & (p < hi)
+        t_enter = np.where(moving, np.minimum(t_a, t_b), np.where(inside, -np.inf, np.inf))
+        t_exit = np.where(moving, np.maximum(t_a, t_b), np.where(inside, np.inf, -np.inf))
+        return t_enter, t_exit
+
+    tx_enter, tx_exit = slab(x1, x2 - x1, left, right)
+    ty_enter, ty_exit = slab(y1, y2 - y1, top, bottom)
+    t_enter = np.maximum(np.maximum(tx_enter, ty_enter), 0.0)
+    t_exit = np.minimum(np.minimum(tx_exit, ty_exit), 1.0)
+    return t_enter < t_exit
+
+
+def swept_circles_hit_walls(x1, y1, x2, y2, radius, walls):
+    """Vectorized swept-circle test: does each circle touch a wall while moving (x1,y1)->(x2,y2)?
+
+    A circle of radius r touches a wall when its centre enters the wall's rect grown by
+    r with rounded corners (the same region `Wall.collides_circle` tests), so each path
+    is tested against the rect grown along x, the rect grown along y and the four corner
+    discs. Unlike a test at the end position, this catches fast circles that would
+    otherwise step over a thin wall in one frame. Returns a boolean array, all False
+    while the layout's collision is off (see `WallList`).
+    """
+    x1 = np.asarray(x1, dtype=float)
+    y1 = np.asarray(y1, dtype=float)
+    x2 = np.asarray(x2, dtype=float)
+    y2 = np.asarray(y2, dtype=float)
+    r = np.broadcast_to(np.asarray(radius, dtype=float), x1.shape)
+    hit = np.zeros(x1.shape, dtype=bool)
+    if not _solid(walls) or x1.size == 0:
+        return hit
+    b = walls.bounds_array if isinstance(walls, WallList) else wall_bounds_array(walls)
+    # bounding boxes of the swept circles, to skip far walls cheaply
+    lo_x = np.minimum(x1, x2) - r
+    hi_x = np.maximum(x1, x2) + r
+    lo_y = np.minimum(y1, y2) - r
+    hi_y = np.maximum(y1, y2) + r
+    for left, top, right, bottom in b:
+        k = np.flatnonzero((hi_x > left) & (lo_x < right) & (hi_y > top) & (lo_y < bottom) & ~hit)
+        if len(k) == 0:
+            continue
+        hit[k] = _swept_circles_hit_rect(x1[k], y1[k], x2[k], y2[k], r[k], left, top, right, bottom)
+    return hit
+
+
+def _swept_circles_hit_rect(x1, y1, x2, y2, r, left, top, right, bottom):
+    # end position, exactly as Wall.collides_circle
+    dx = x2 - np.clip(x2, left, right)
+    dy = y2 - np.clip(y2, top, bottom)
+    hit = dx * dx + dy * dy < r * r
+    # flat faces: the rect grown by r along one axis only
+    hit |= _segments_cross_boxes(x1, y1, x2, y2, left - r, top, right + r, bottom)
+    hit |= _segments_cross_boxes(x1, y1, x2, y2, left, top - r, right, bottom + r)
+    # rounded corners: path passes within r of a corner
+    sx = x2 - x1
+    sy = y2 - y1
+    length2 = sx * sx + sy * sy
+    safe = np.where(length2 > 0, length2, 1.0)
+    for cx, cy in ((left, top), (right, top), (left, bottom), (right, bottom)):
+        u = np.clip(((cx - x1) * sx + (cy - y1) * sy) / safe, 0.0, 1.0)
+        ex = x1 + u * sx - cx
+        ey = y1 + u * sy - cy
+        hit |= ex * ex + ey * ey < r * r
+    return hit
+
+
+def walls_block_move(walls, x1, y1, x2, y2, radius):
+    """Return True if moving a circle from (x1,y1) to (x2,y2) runs into a wall on the way.
+
+    Candidate walls come from the grid DDA over the cells the path crosses. A circle
+    that already overlaps a wall is only blocked if it still overlaps at the end, so it
+    can always move out.
+    """
+    if not _solid(walls):
+        return False
+    if isinstance(walls, WallList):
+        walls = walls.broadphase.near_swept_circle(x1, y1, x2, y2, radius)
+        if not walls:
             return False
-        # Call the original method
-        return self._orig_collides_circle(x, y, r)
-    try:
-        from walls import Wall
-        if not hasattr(Wall, "_orig_collides_circle"):
-            Wall._orig_collides_circle = Wall.collides_circle
-            Wall.collides_circle = new_collides_circle
-    except Exception:
-        pass
+    for w in walls:
+        if w.collides_circle(x1, y1, radius):
+            return any(w.collides_circle(x2, y2, radius) for w in walls)
+    for w in walls:
+        if _swept_circle_hits_rect(x1, y1, x2, y2, radius, w.left, w.top, w.right, w.bottom):
+            return True
+    return False
 
-# Patch on import
-patch_wall_collision()
 
-def respawn_walls_avoiding_player(walls, player, min_dist=40):
+def _swept_circle_hits_rect(x1, y1, x2, y2, r, left, top, right, bottom):
+    """Scalar version of `_swept_circles_hit_rect`."""
+    if (max(x1, x2) + r <= left or min(x1, x2) - r >= right
+            or max(y1, y2) + r <= top or min(y1, y2) - r >= bottom):
+        return False
+    cx = min(max(x2, left), right)
+    cy = min(max(y2, top), bottom)
+    if (x2 - cx) ** 2 + (y2 - cy) ** 2 < r * r:
+        return True
+    if (_segment_crosses_box(x1, y1, x2, y2, left - r, top, right + r, bottom)
+            or _segment_crosses_box(x1, y1, x2, y2, left, top - r, right, bottom + r)):
+        return True
+    sx = x2 - x1
+    sy = y2 - y1
+    length2 = sx * sx + sy * sy
+    for px, py in ((left, top), (right, top), (left, bottom), (right, bottom)):
+        u = 0.0 if length2 == 0 else min(1.0, max(0.0, ((px - x1) * sx + (py - y1) * sy) / length2))
+        if (x1 + u * sx - px) ** 2 + (y1 + u * sy - py) ** 2 < r * r:
+            return True
+    return False
+
+
+def _segment_crosses_box(x1, y1, x2, y2, left, top, right, bottom):
+    """Scalar version of `_segments_cross_boxes`."""
+    t_enter = 0.0
+    t_exit = 1.0
+    for p, d, lo, hi in ((x1, x2 - x1, left, right), (y1, y2 - y1, top, bottom)):
+        if d == 0:
+            if not lo < p < hi:
+                return False
+            continue
+        t_a = (lo - p) / d
+        t_b = (hi - p) / d
+        if t_a > t_b:
+            t_a, t_b = t_b, t_a
+        t_enter = max(t_enter, t_a)
+        t_exit = min(t_exit, t_b)
+    return t_enter < t_exit
+
+def respawn_walls_avoiding_player(walls, player, min_dist=40, rng=None, layout=None):
     """
     Replace the contents of the walls list with new walls,
     ensuring none overlap the player (within min_dist of player center).
+    `rng` is the random stream for the new layout (see `create_random_walls`).
+    `layout` is a layout made earlier with `prepare_layout` to use instead; the
+    visibility table for the walls that remain is derived from its table.
     """
     from config import WORLD_WIDTH, WORLD_HEIGHT
     # Remove all current walls
     walls.clear()
     # Recreate walls, avoiding player
-    new_walls = create_random_walls()
+    new_walls = layout if layout is not None else create_random_walls(rng=rng)
     safe_walls = []
     for w in new_walls:
         try:
@@ -557,3 +978,18 @@ def respawn_walls_avoiding_player(walls, player, min_dist=40):
         except Exception:
             safe_walls.append(w)
     walls.extend(safe_walls)
+    if layout is not None:
+        kept = set(map(id, safe_walls))
+        walls._pvs = layout.pvs.subset([id(w) in kept for w in layout])
+
+
+def prepare_layout(rng=None):
+    """Create a random layout and start building its visibility table in the background.
+
+    Call it while nothing is being simulated (a menu or fade-in is up) so the build
+    does not slow world steps, then play the layout later (see `reset_game` and
+    `respawn_walls_avoiding_player`).
+    """
+    walls = create_random_walls(rng=rng)
+    walls.pvs
+    return walls
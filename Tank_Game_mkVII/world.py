@@ -0,0 +1,494 @@
+"""World state and headless simulation step for Tank Game.
+
+`World` owns everything the game loop used to keep in local variables (player, bots,
+bullets, walls, boss manager, specialization menu state) and advances it one frame at a
+time with `World.step(FrameInput)`. Nothing in here touches the display, surfaces or the
+clock, so a world can be stepped over a thousand times per second (see `turbo`) for soak
+tests and balancing. Rendering (see `game.draw_world`) only reads world state.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+
+import pygame
+
+from config import (
+    WIDTH, HEIGHT, WORLD_WIDTH, WORLD_HEIGHT, WHITE, GREEN, FPS,
+    BOT_SPAWN_RATE, MAX_BOTS, UPGRADE_COST, KILLS_PER_LEVEL
+)
+from core import Tank, clear_barrel_sprites
+from projectiles import ProjectileStore
+from spatial import SpatialHash, TANK_CELL_SIZE
+from navigation import FlowField
+from ai_helpers import init_bot_ai, update_all_bots
+from upgrades import specialization_tree, root_defaults
+from walls import create_random_walls, prepare_layout, line_of_sight_batch
+from boss import BossManager
+from rng import WorldRNG
+from profiler import profiler
+from gcmanager import gc_manager
+
+# Root branches in the order they are offered by the specialization menu (keys 1..4)
+ROOT_ORDER = ["dual_barrel", "twin_gun", "heavy_cannon", "sniper_barrel"]
+
+
+@dataclass
+class FrameInput:
+    """Player input for a single simulation frame.
+
+    `aim` is the aim target in world coordinates (None keeps the previous aim angle),
+    `aim_angle` sets the aim angle in radians directly and takes precedence over `aim`
+    (replayed input uses it), `keys` lists KEYDOWN key codes received this frame and
+    `clicks` lists left-click screen positions.
+    """
+    up: bool = False
+    down: bool = False
+    left: bool = False
+    right: bool = False
+    aim: tuple | None = None
+    aim_angle: float | None = None
+    fire: bool = False
+    keys: list = field(default_factory=list)
+    clicks: list = field(default_factory=list)
+
+    def held(self):
+        """The same held controls without this frame's one-shot key presses and clicks."""
+        return replace(self, keys=[], clicks=[])
+
+    def key_state(self):
+        """Return a mapping usable wherever `pygame.key.get_pressed()` was indexed."""
+        return {
+            pygame.K_w: self.up,
+            pygame.K_s: self.down,
+            pygame.K_a: self.left,
+            pygame.K_d: self.right,
+        }
+
+
+def reset_game(rng=None, walls=None):
+    """Build a new session; draws come from `rng` (a `WorldRNG`; default: `random`)."""
+    # Create walls first so we can pick valid spawn positions (unless prepared earlier)
+    if walls is None:
+        walls = create_random_walls(rng=rng.layout if rng is not None else None)
+
+    # find a safe spawn position for the player
+    player_radius = 20
+    px, py = None, None
+    try:
+        from walls import find_free_position
+        px, py = find_free_position(player_radius, walls, rng=rng.spawn if rng is not None else None)
+    except Exception:
+        px, py = WORLD_WIDTH // 2, WORLD_HEIGHT // 2
+
+    player = Tank(px, py, WHITE, True)
+    player.id = -1
+    player.drone_spawn_timer = 0
+    player.bot_kills = 0  # Ensure bot_kills exists for BossManager
+    bullets = ProjectileStore()
+    bots = []
+    frame_count = 0
+    game_over = False
+    difficulty_level = 1
+    show_specialization_menu = False
+    bot_id_counter = 0
+
+    # Initialize BossManager
+    boss_manager = BossManager(player, bullets, bots, walls, rng=rng)
+
+    return player, bullets, bots, frame_count, game_over, difficulty_level, show_specialization_menu, bot_id_counter, walls, boss_manager
+
+
+def spawn_bot(difficulty_level, bot_id, walls, rng=None):
+    """Create a bot; draws come from `rng` (a `WorldRNG`; default: `random`)."""
+    spawn_rng = rng.spawn if rng is not None else random
+    # choose a spawn point that doesn't overlap walls
+    bot_radius = 20
+    try:
+        from walls import find_free_position
+        bx, by = find_free_position(bot_radius, walls, rng=spawn_rng)
+    except Exception:
+        bx, by = spawn_rng.randint(bot_radius, WORLD_WIDTH - bot_radius), spawn_rng.randint(bot_radius, WORLD_HEIGHT - bot_radius)
+    bot = Tank(bx, by, GREEN)
+    bot.id = bot_id
+    # scale stats with difficulty
+    bot.base_bullet_speed += difficulty_level * 0.3
+    bot.base_damage += difficulty_level * 2.0
+    bot.speed += difficulty_level * 0.2
+    bot.fire_rate = 1.0 + 0.1 * difficulty_level  # bots also get faster fire rates
+    # mounts: single aim gun using bot's base profile color
+    bot.gun_mounts = bot.gun_mounts[:1]  # keep one mount
+    bot.cooldown = 0
+    init_bot_ai(bot, rng=rng.ai if rng is not None else None)
+    return bot
+
+
+class World:
+    """A single game session that can be advanced with or without a display."""
+
+    def __init__(self, seed=None):
+        # Every random draw in the world comes from these streams, so worlds built
+        # with the same seed (and fed the same input) play out identically
+        self.rng = WorldRNG(seed)
+        # Debug / temporary testing toggle: F2 enables rapid unlock (kills-per-level = 1).
+        # Survives restarts, like it did in the original game loop.
+        self.rapid_unlock = False
+        self.aim_angle = 0.0
+        self.tick = 0  # total frames stepped, including paused/menu frames
+        self.grid = SpatialHash(TANK_CELL_SIZE)  # per-frame broadphase for bullet hits
+        self.flow = FlowField()  # path field toward the player for bots without LOS
+        self._prev_positions = []  # (entity, x, y) at the start of the last step
+        self._next_walls = None  # layout for the next session, prepared at game over
+        self.reset()
+
+    def reset(self):
+        (self.player, self.bullets, self.bots, self.frame_count, self.game_over,
+         self.difficulty_level, self.show_specialization_menu, self.bot_id_counter,
+         self.walls, self.boss_manager) = reset_game(self.rng, walls=self._next_walls)
+        self._next_walls = None
+        # Play never starts before the layout's visibility table is ready. A layout
+        # prepared at game over is normally finished by now; the first one is built here.
+        self.walls.pvs.wait()
+        self.shotgun_active = False
+        self.current_tree = None
+        self.current_options = None
+        # Specialization menu stage: None | 'root' | 'option'
+        self.specialization_stage = None
+        self.pending_root = None
+        self.specializations_shown = 0  # how many specialization menus have been completed
+        self.kills_at_last_specialization = 0  # kill count when last specialization menu was shown
+        # freeze the new session's long-lived objects at the next collection slot
+        gc_manager.after_reset()
+
+    def camera(self):
+        """Return the top-left world coordinate of the view centred on the player."""
+        return self.player.x - WIDTH // 2, self.player.y - HEIGHT // 2
+
+    # ------------------------------------------------------------------
+    # Input
+    # ------------------------------------------------------------------
+    def handle_click(self, pos):
+        # keep mouse click support for the boss button
+        self.boss_manager.handle_click(pos)
+
+    def handle_key(self, key):
+        """Apply a single KEYDOWN to the world (upgrades, menus, boss start, restart)."""
+        player = self.player
+        boss_manager = self.boss_manager
+
+        # Start boss with key 0 when available
+        if key == pygame.K_0:
+            if not self.game_over and boss_manager.unlocked and not boss_manager.active and not self.show_specialization_menu:
+                boss_manager.start_boss()
+                return
+
+        if self.game_over:
+            if key == pygame.K_r:
+                self.reset()
+            return
+
+        if self.show_specialization_menu:
+            # Two-stage specialization selection:
+            # Stage 'root' -> player picks one of the root branches (1..4)
+            # Stage 'option' -> player picks the chosen branch's option (1..2)
+            if self.specialization_stage is None:
+                self.specialization_stage = 'root'
+
+            if self.specialization_stage == 'root':
+                # Root selection uses keys 1..4. Apply the root immediately and resume gameplay.
+                if key in (pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4):
+                    idx = {pygame.K_1: 0, pygame.K_2: 1, pygame.K_3: 2, pygame.K_4: 3}[key]
+                    root_key = ROOT_ORDER[idx]
+                    # apply root-default mounts immediately
+                    mounts, shot_flag = root_defaults(root_key, player.color)
+                    # replace player's mounts and clear spawners
+                    player.gun_mounts = mounts
+                    player.drone_spawner_mounts = []
+                    player.spec_key = root_key
+                    self.shotgun_active = shot_flag
+                    # Apply shotgun modifier flag to the player (affects firing)
+                    player.is_shotgun = shot_flag
+                    # close menu and resume gameplay; do not increment specialization_count yet
+                    self.show_specialization_menu = False
+                    self.specialization_stage = None
+                    self.pending_root = None
+
+            elif self.specialization_stage == 'option':
+                # Option selection uses keys 1..2
+                if key in (pygame.K_1, pygame.K_2) and self.pending_root is not None:
+                    chosen = 0 if key == pygame.K_1 else 1
+                    player.integrate_specialization(self.pending_root, chosen)
+                    self.shotgun_active = self.current_options[chosen].get('shotgun', False)
+                    # Apply shotgun modifier to the player (affects firing)
+                    player.is_shotgun = self.shotgun_active
+                    self.show_specialization_menu = False
+                    self.specialization_stage = None
+                    self.pending_root = None
+                    # clear stored root since we've finalized the option
+                    player.spec_key = None
+                    # Mark full specialization complete to prevent future branches
+                    player.specialization_complete = True
+                    # increment specialization count now that selection is finalized
+                    player.specialization_count += 1
+                    self.specializations_shown += 1
+            return
+
+        # Debug: toggle rapid unlock (press F2)
+        if key == pygame.K_F2:
+            self.rapid_unlock = not self.rapid_unlock
+            return
+
+        # Stat upgrades for 5 EXP (only if specialization menu is NOT open)
+        if player.exp >= UPGRADE_COST:
+            if key == pygame.K_1:
+                player.speed += 0.5
+                player.exp -= UPGRADE_COST
+            elif key == pygame.K_2:
+                # Increase bullet speed across mounts
+                for m in player.gun_mounts:
+                    m.profile.speed += 1.0
+                clear_barrel_sprites()  # barrel length follows bullet speed
+                player.exp -= UPGRADE_COST
+            elif key == pygame.K_3:
+                # Increase damage across mounts
+                for m in player.gun_mounts:
+                    m.profile.damage += 2.0
+                clear_barrel_sprites()  # barrel width follows damage
+                player.exp -= UPGRADE_COST
+            elif key == pygame.K_4:
+                player.max_health += 20
+                player.health = min(player.max_health, player.health + 20)
+                player.exp -= UPGRADE_COST
+            elif key == pygame.K_5:
+                # Fire rate upgrade
+                player.fire_rate += 0.5
+                player.exp -= UPGRADE_COST
+
+    # ------------------------------------------------------------------
+    # Simulation
+    # ------------------------------------------------------------------
+    def step(self, inp: FrameInput | None = None):
+        """Advance the world by one frame. Never draws and never waits on the clock."""
+        if inp is None:
+            inp = FrameInput()
+        self.tick += 1
+        self._prev_positions = [(e, e.x, e.y) for e in self._movers()]
+
+        for pos in inp.clicks:
+            self.handle_click(pos)
+        for key in inp.keys:
+            self.handle_key(key)
+
+        if self.game_over:
+            return
+
+        if self.show_specialization_menu:
+            # Gameplay is paused while the menu is open, but drones keep flying
+            self.player.update_drones(self.bots, self.walls)
+            return
+
+        with profiler.stage("player"):
+            self._step_player(inp)
+        with profiler.stage("drones"):
+            self.player.update_drones(self.bots, self.walls)
+        with profiler.stage("spawn"):
+            self._spawn_bots()
+        with profiler.stage("ai"):
+            self._step_bots()
+        with profiler.stage("bullets"):
+            self._step_bullets()
+
+        # Update boss manager (handles boss movement, firing, collisions)
+        with profiler.stage("boss"):
+            self.boss_manager.update()
+
+        # Game over check
+        if self.player.health <= 0:
+            self.game_over = True
+            # build the next session's layout while the game-over screen is up
+            self._next_walls = prepare_layout(rng=self.rng.layout)
+
+    def velocity(self, entity):
+        """Return how far `entity` moved in the last step as (dx, dy); (0, 0) if it was not there."""
+        for e, x, y in self._prev_positions:
+            if e is entity:
+                return entity.x - x, entity.y - y
+        return 0.0, 0.0
+
+    def _movers(self):
+        """Entities drawn at interpolated positions (see `interpolated`)."""
+        movers = [self.player, *self.bots, *self.player.drones]
+        if self.boss_manager.boss is not None:
+            movers.append(self.boss_manager.boss)
+        return movers
+
+    @contextmanager
+    def interpolated(self, alpha):
+        """Temporarily place entities `alpha` (0..1) of the way from the previous step.
+
+        With a fixed simulation tick, rendered frames fall between two ticks; drawing
+        inside this block shows where everything would be at that moment. Projectiles
+        are placed `1 - alpha` velocity steps back. Positions are restored on exit.
+        """
+        if alpha >= 1.0:
+            yield
+            return
+        back = 1.0 - alpha
+        saved = []
+        for e, px, py in self._prev_positions:
+            saved.append((e, e.x, e.y))
+            e.x = px + (e.x - px) * alpha
+            e.y = py + (e.y - py) * alpha
+        stores = [self.bullets, self.boss_manager.boss_bullets]
+        saved_xy = [(s.x[:s.count].copy(), s.y[:s.count].copy()) for s in stores]
+        for s in stores:
+            n = s.count
+            s.x[:n] -= s.vx[:n] * back
+            s.y[:n] -= s.vy[:n] * back
+        try:
+            yield
+        finally:
+            for e, x, y in saved:
+                e.x = x
+                e.y = y
+            for s, (x, y) in zip(stores, saved_xy):
+                s.x[:s.count] = x
+                s.y[:s.count] = y
+
+    def _step_player(self, inp):
+        player = self.player
+        player.move(inp.key_state(), self.walls)
+        player.regenerate()
+        player.tick_fire_cooldown()
+        player.update_drone_spawners()
+
+        if inp.aim_angle is not None:
+            self.aim_angle = inp.aim_angle
+        elif inp.aim is not None:
+            self.aim_angle = math.atan2(inp.aim[1] - player.y, inp.aim[0] - player.x)
+
+        # Continuous fire while the fire button is held
+        if inp.fire and player.can_fire():
+            player.fire(self.aim_angle, "player", player.id, store=self.bullets)
+            player.trigger_fire()
+
+    def _spawn_bots(self):
+        self.frame_count += 1
+        # do not spawn regular bots while boss is active
+        if self.frame_count % BOT_SPAWN_RATE == 0 and len(self.bots) < MAX_BOTS and not self.boss_manager.active:
+            bot = spawn_bot(self.difficulty_level, self.bot_id_counter, self.walls, self.rng)
+            self.bot_id_counter += 1
+            self.bots.append(bot)
+
+    def _step_bots(self):
+        player = self.player
+        bots = self.bots
+        if not bots:
+            return
+
+        # Line of sight from every bot to the player, tested in one batch before moving
+        # (for the AI) and once more after moving (for firing)
+        los = self._bots_los()
+        if not los.all():
+            # one shared path field toward the player serves every bot without LOS
+            self.flow.update(self.walls, player.x, player.y)
+        # Bot AI: orbiting movement with randomness and spacing, all bots in one pass
+        angles = update_all_bots(bots, player, walls=self.walls, los=los.tolist(), flow=self.flow,
+                                 rng=self.rng.ai)
+
+        # Aim and fire based on fire_rate
+        los = self._bots_los()
+        for bot, ang_to_player, has_los in zip(bots, angles, los.tolist()):
+            bot.fire_cooldown -= 1
+            if bot.fire_cooldown <= 0:
+                # Only fire if there's line of sight to the player
+                if has_los:
+                    # One bullet from the bot's single mount
+                    prof = bot.gun_mounts[0].profile
+                    self.bullets.spawn(bot.x, bot.y, ang_to_player, prof.speed, prof.damage, prof.radius, prof.color, "bot", bot.id)
+
+                # reset cooldown based on bot fire rate regardless (prevents instant fire when LOS appears)
+                frames_per_shot = max(1, int(FPS / bot.fire_rate))
+                bot.fire_cooldown = frames_per_shot
+
+    def _bots_los(self):
+        player = self.player
+        n = len(self.bots)
+        return line_of_sight_batch(
+            [b.x for b in self.bots], [b.y for b in self.bots],
+            [player.x] * n, [player.y] * n, self.walls)
+
+    def _step_bullets(self):
+        player = self.player
+        bots = self.bots
+        store = self.bullets
+        store.move()
+        # stray shots expire once they leave the world
+        store.expire()
+
+        # Bullet-wall collisions: bullets are removed on impact with any wall
+        store.kill(store.wall_hits(self.walls))
+
+        # Player bullets vs bots through a per-frame spatial hash. Hits are resolved in
+        # bullet order and each bullet damages the first bot (in list order) it overlaps,
+        # like the old per-bullet loop did.
+        grid = self.grid
+        grid.clear()
+        for bot in bots:
+            grid.insert(bot, bot.x, bot.y, bot.radius)
+        used = set()
+        dead = set()
+        for slot, (_, bot, _, _, _) in store.grid_hits(grid, "player"):
+            if slot in used or id(bot) in dead:
+                continue
+            used.add(slot)
+            bot.health -= float(store.damage[slot])
+            store.alive[slot] = False
+            if bot.health <= 0:
+                dead.add(id(bot))
+                bots.remove(bot)
+                self._on_bot_killed()
+
+        # Bot bullets do not hit bots (friendly fire disabled); check player collision only
+        for i in store.circle_hits(player.x, player.y, player.radius, "bot").tolist():
+            player.health -= float(store.damage[i])
+            store.alive[i] = False
+
+        store.compact()
+
+    def _on_bot_killed(self):
+        player = self.player
+        player.exp += 5
+        player.bot_kills += 1
+
+        # Update boss unlock status
+        self.boss_manager.check_unlock(player.bot_kills)
+
+        # Check if we should show a specialization menu based purely on kills
+        # Use a single effective threshold so rapid unlock behaves consistently
+        effective_kills_threshold = 1 if self.rapid_unlock else KILLS_PER_LEVEL
+        kills_since_last_spec = player.bot_kills - self.kills_at_last_specialization
+
+        should_show_menu = (kills_since_last_spec >= effective_kills_threshold)
+
+        if should_show_menu and not self.show_specialization_menu and not player.specialization_complete:
+            self.show_specialization_menu = True
+            # If the player already picked a root previously, show the options
+            if player.spec_key:
+                self.specialization_stage = 'option'
+                self.pending_root = player.spec_key
+                self.current_tree = specialization_tree(self.pending_root, player.color)
+                self.current_options = self.current_tree['options']
+            else:
+                self.specialization_stage = 'root'
+                self.pending_root = None
+            self.kills_at_last_specialization = player.bot_kills
+
+        # Level up for progression display (independent of specialization menus)
+        effective_kills_per_level = 1 if self.rapid_unlock else KILLS_PER_LEVEL
+        if player.bot_kills % effective_kills_per_level == 0:
+            player.level += 1
+            self.difficulty_level += 1